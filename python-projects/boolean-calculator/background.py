@@ -0,0 +1,58 @@
+#Runs a computation in a worker thread so the Tk event loop stays responsive.
+#The worker never touches a widget: the window polls the job with window.after and shows its progress and result.
+import threading
+import calculate as clc
+
+
+class Job:
+    """
+    One computation on a daemon thread. `function(*args, progress=...)` receives a callback that records
+    how far it got and raises calculate.Cancelled once cancel() was called.
+    """
+
+    def __init__(self, function, *args, report=True):
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+        self.finished = False
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, args=(function, args, report), daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def progress(self, done, total):
+        if self.stop.is_set():
+            raise clc.Cancelled()
+        self.done, self.total = done, total
+
+    def run(self, function, args, report):
+        try:
+            if report:
+                self.result = function(*args, progress=self.progress)
+            else:
+                self.result = function(*args)
+        except clc.Cancelled:
+            pass
+        except Exception as error:
+            self.error = error
+        finally:
+            self.finished = True
+
+    def cancel(self):
+        """
+        Stops the computation at its next progress report. Functions without progress reports run to the end
+        and their result is simply never shown.
+        """
+        self.stop.set()
+
+    @property
+    def cancelled(self):
+        return self.stop.is_set()
+
+    def status(self):
+        if not self.total:
+            return "Working..."
+        return "Working... {}/{} ({:.0f}%)".format(self.done, self.total, 100 * self.done / self.total)
@@ -0,0 +1,257 @@
+#Reduced ordered binary decision diagrams (ROBDD).
+#A formula becomes a canonical node id: two formulas built in the same manager are equivalent
+#exactly when they get the same id, and the size follows the formula's structure instead of 2^n.
+import random
+import formula
+
+
+FALSE = 0
+TRUE = 1
+
+# Value of every binary operator on the terminals
+OPERATIONS = {
+    "and": lambda a, b: a & b,
+    "or": lambda a, b: a | b,
+    "xor": lambda a, b: a ^ b,
+    "implies": lambda a, b: (1 - a) | b,
+    "iff": lambda a, b: 1 - (a ^ b),
+}
+
+COMMUTATIVE = {"and", "or", "xor", "iff"}
+
+# A manager with a progress callback reports every this many new nodes, so a long apply can be cancelled
+PROGRESS_NODES = 1000
+
+
+class LimitExceeded(Exception):
+    """
+    The diagram grew past the node limit of its manager.
+    """
+
+
+def order(*roots, heuristic="appearance"):
+    """
+    Variable order for the roots.
+    "appearance": first occurrence from left to right, which keeps related variables close together.
+    "alphabetical": the order used by the truth table.
+    """
+    if heuristic == "alphabetical":
+        return formula.variables(*roots)
+    if heuristic != "appearance":
+        raise ValueError("Unknown variable ordering heuristic: " + heuristic)
+
+    names = []
+    for node in formula.subformulas(*roots):
+        for arg in node.args:
+            if arg.op == "var" and arg.name not in names:
+                names.append(arg.name)
+    # Roots that are a bare variable have no subformula to find them in
+    return names + [name for name in formula.variables(*roots) if name not in names]
+
+
+class BDD:
+    """
+    Manager holding the unique table (one node per (level, low, high)) and the computed table
+    (results of apply, so no pair of nodes is combined twice).
+    `progress(nodes, limit)` is called for every subformula built and every PROGRESS_NODES nodes, and may raise to stop.
+    """
+
+    def __init__(self, variables, limit=None, progress=None):
+        self.variables = list(variables)
+        self.position = {name: i for i, name in enumerate(self.variables)}
+        self.limit = limit
+        self.progress = progress
+        terminal = len(self.variables)
+        self.levels = [terminal, terminal]
+        self.lows = [FALSE, TRUE]
+        self.highs = [FALSE, TRUE]
+        self.unique = {}
+        self.computed = {}
+
+    def __len__(self):
+        return len(self.levels)
+
+    def node(self, level, low, high):
+        if low == high:
+            return low
+        key = (level, low, high)
+        u = self.unique.get(key)
+        if u is None:
+            if self.limit is not None and len(self.levels) >= self.limit:
+                raise LimitExceeded("BDD exceeded {} nodes".format(self.limit))
+            u = len(self.levels)
+            if self.progress is not None and u % PROGRESS_NODES == 0:
+                self.progress(u, self.limit or 0)
+            self.levels.append(level)
+            self.lows.append(low)
+            self.highs.append(high)
+            self.unique[key] = u
+        return u
+
+    def variable(self, name):
+        return self.node(self.position[name], FALSE, TRUE)
+
+    def negate(self, u):
+        return self.apply("xor", u, TRUE)
+
+    def apply(self, op, u, v):
+        if u <= TRUE and v <= TRUE:
+            return OPERATIONS[op](u, v)
+        if op == "and":
+            if u == FALSE or v == FALSE:
+                return FALSE
+            if u == TRUE or u == v:
+                return v
+            if v == TRUE:
+                return u
+        elif op == "or":
+            if u == TRUE or v == TRUE:
+                return TRUE
+            if u == FALSE or u == v:
+                return v
+            if v == FALSE:
+                return u
+        elif op == "xor":
+            if u == v:
+                return FALSE
+            if u == FALSE:
+                return v
+            if v == FALSE:
+                return u
+        if op in COMMUTATIVE and v < u:
+            u, v = v, u
+
+        key = (op, u, v)
+        result = self.computed.get(key)
+        if result is not None:
+            return result
+
+        level = min(self.levels[u], self.levels[v])
+        u0, u1 = (self.lows[u], self.highs[u]) if self.levels[u] == level else (u, u)
+        v0, v1 = (self.lows[v], self.highs[v]) if self.levels[v] == level else (v, v)
+        result = self.node(level, self.apply(op, u0, v0), self.apply(op, u1, v1))
+        self.computed[key] = result
+        return result
+
+    def build(self, root):
+        """
+        Canonical node of a formula. Every distinct subformula of the DAG is built once.
+        """
+        built = {}
+
+        def value(node):
+            return self.variable(node.name) if node.op == "var" else built[node]
+
+        for node in formula.subformulas(root):
+            if self.progress is not None:
+                self.progress(len(self.levels), self.limit or 0)
+            if node.op == "true":
+                built[node] = TRUE
+            elif node.op == "false":
+                built[node] = FALSE
+            elif node.op == "not":
+                built[node] = self.negate(value(node.args[0]))
+            else:
+                built[node] = self.apply(node.op, value(node.args[0]), value(node.args[1]))
+        return value(root)
+
+    def paths(self, u):
+        """
+        For every node reachable from u, the number of assignments of the variables from its level down
+        that reach TRUE through it.
+        """
+        counts = {FALSE: 0, TRUE: 1}
+
+        def visit(w):
+            if w not in counts:
+                level = self.levels[w]
+                low, high = self.lows[w], self.highs[w]
+                counts[w] = (visit(low) << (self.levels[low] - level - 1)) + (visit(high) << (self.levels[high] - level - 1))
+            return counts[w]
+
+        visit(u)
+        return counts
+
+    def count(self, u):
+        """
+        Number of assignments of all the manager's variables that satisfy u.
+        """
+        return self.paths(u)[u] << self.levels[u]
+
+    def sample(self, u, count=1, rng=random):
+        """
+        `count` satisfying assignments of u drawn uniformly (with replacement): every branch is taken
+        with probability proportional to the number of models below it. Empty when u is FALSE.
+        """
+        if u == FALSE:
+            return []
+        counts = self.paths(u)
+        samples = []
+        for _ in range(count):
+            assignment = {}
+            w = u
+            for level, name in enumerate(self.variables):
+                if self.levels[w] > level:
+                    # u does not test this variable here: both values lead to as many models
+                    assignment[name] = rng.random() < 0.5
+                    continue
+                low, high = self.lows[w], self.highs[w]
+                weight_low = counts[low] << (self.levels[low] - level - 1)
+                weight_high = counts[high] << (self.levels[high] - level - 1)
+                assignment[name] = rng.randrange(weight_low + weight_high) < weight_high
+                w = high if assignment[name] else low
+            samples.append(assignment)
+        return samples
+
+    def pick(self, u):
+        """
+        One satisfying assignment of u (variables u does not depend on are False), or None.
+        """
+        if u == FALSE:
+            return None
+        assignment = dict.fromkeys(self.variables, False)
+        while u > TRUE:
+            name = self.variables[self.levels[u]]
+            if self.highs[u] != FALSE:
+                assignment[name] = True
+                u = self.highs[u]
+            else:
+                u = self.lows[u]
+        return assignment
+
+    def minterms(self, u):
+        """
+        Lazily yields every satisfying assignment of u as a {variable: bool} dict, True before False
+        as in the truth table when the manager uses the table's variable order.
+        """
+        values = {}
+
+        def walk(w, level):
+            if w == FALSE:
+                return
+            if level == len(self.variables):
+                yield dict(values)
+                return
+            name = self.variables[level]
+            if self.levels[w] > level:
+                children = (w, w)
+            else:
+                children = (self.highs[w], self.lows[w])
+            for value, child in zip((True, False), children):
+                values[name] = value
+                yield from walk(child, level + 1)
+
+        yield from walk(u, 0)
+
+    def size(self, u):
+        """
+        Number of internal nodes reachable from u.
+        """
+        seen = set()
+        stack = [u]
+        while stack:
+            w = stack.pop()
+            if w > TRUE and w not in seen:
+                seen.add(w)
+                stack += [self.lows[w], self.highs[w]]
+        return len(seen)
@@ -0,0 +1,35 @@
+#Compares the compiled evaluator against the legacy eval() per row and subformula
+#Usage: python benchmark.py [number of variables ...]   (default: 10 16 20)
+import sys
+import time
+from string import ascii_letters
+import calculate as clc
+
+
+def build_expression(size):
+    """
+    Builds (a∧b)∨(c∧d)∨... over the first `size` letters, lowercase then uppercase.
+    """
+    letters = ascii_letters[:size]
+    groups = ["({}∧{})".format(letters[i], letters[i + 1]) for i in range(0, size - 1, 2)]
+    if size % 2:
+        groups.append(letters[-1])
+    return "∨".join(groups)
+
+
+def measure(expression, compiled):
+    (variables, final), = clc.prepare(expression)
+
+    start = time.perf_counter()
+    clc.eval_operations(final, variables, compiled=compiled)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 16, 20]
+    print("variables\trows\teval() s\tcompiled s\tspeedup")
+    for size in sizes:
+        expression = build_expression(size)
+        legacy = measure(expression, compiled=False)
+        compiled = measure(expression, compiled=True)
+        print("{}\t{}\t{:.3f}\t{:.3f}\t{:.1f}x".format(size, 2 ** size, legacy, compiled, legacy / compiled))
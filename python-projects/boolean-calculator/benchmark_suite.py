@@ -0,0 +1,195 @@
+#Reproducible benchmark suite for the truth-table engine, to catch regressions as the evaluator changes.
+#Every case (formula family x number of variables x engine) runs in a fresh process, so its peak RSS is its own.
+#Usage: python benchmark_suite.py [--families ...] [--sizes N ...] [--engines ...] [--repeat N] [--output FILE]
+#Results are printed as a table and written as JSON (default: benchmark_results.json) after every case,
+#so an interrupted or failing run keeps what it measured.
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from string import ascii_letters
+import calculate as clc
+import gray
+from benchmark import build_expression
+
+try:
+    import resource
+except ImportError:  # Windows, peak RSS is not reported
+    resource = None
+
+
+def chain(size):
+    """
+    (a→b)∧(b→c)∧...: every variable links to the next one.
+    """
+    letters = ascii_letters[:size]
+    return "∧".join("({}→{})".format(letters[i], letters[i + 1]) for i in range(size - 1))
+
+
+def parity(size):
+    """
+    a⨁b⨁c⨁...: the XOR ladder, half of the rows true and no short cut for any of them.
+    """
+    return "⨁".join(ascii_letters[:size])
+
+
+def nested(size):
+    """
+    ((a→b)→c)→...: implications nested as deep as there are variables.
+    """
+    letters = ascii_letters[:size]
+    expression = letters[0]
+    for letter in letters[1:]:
+        expression = "({}→{})".format(expression, letter)
+    return expression
+
+
+def duplicated(size):
+    """
+    ((a∧b)⨁(b∧c))∨((b∧c)⨁(c∧d))∨...: every pair appears twice, so shared subformulas pay off.
+    """
+    letters = ascii_letters[:size]
+    pairs = ["({}∧{})".format(letters[i], letters[i + 1]) for i in range(size - 1)]
+    terms = ["({}⨁{})".format(pairs[i], pairs[i + 1]) for i in range(len(pairs) - 1)] or pairs
+    return "∨".join(terms)
+
+
+FAMILIES = {
+    "chain": chain,
+    "parity": parity,
+    "nested": nested,
+    "duplicated": duplicated,
+    "sum-of-products": build_expression,
+}
+
+
+def evaluate_table(variables, final):
+    return len(clc.evaluate(final, variables))
+
+
+def evaluate_compiled(variables, final):
+    return len(clc.eval_operations(final, variables))
+
+
+def evaluate_gray(variables, final):
+    return len(gray.eval_operations(final, variables))
+
+
+def evaluate_stream(variables, final):
+    return sum(len(chunk) for chunk in clc.iter_rows(variables, final, clc.CHUNK_SIZE))
+
+
+# What each engine builds: the whole table as calculate() does, the row-by-row compiled path, the Gray-code
+# incremental path, or chunks in constant memory
+ENGINES = {
+    "table": evaluate_table,
+    "compiled": evaluate_compiled,
+    "gray": evaluate_gray,
+    "stream": evaluate_stream,
+}
+
+
+def peak_rss():
+    """
+    Peak resident set size of this process in MiB, or None where it cannot be measured.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(family, size, engine, repeat):
+    """
+    Best wall time of `repeat` runs of one case. Meant to run in its own process.
+    """
+    expression = FAMILIES[family](size)
+    (variables, final), = clc.prepare(expression)
+    base = peak_rss()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = ENGINES[engine](variables, final)
+        times.append(time.perf_counter() - start)
+    seconds = min(times)
+    return {
+        "family": family,
+        "variables": size,
+        "engine": engine,
+        "rows": rows,
+        "columns": len(final),
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else None,
+        "peak_rss_mib": peak_rss(),
+        "base_rss_mib": base,
+        "expression": expression,
+    }
+
+
+def environment():
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {
+        "python": platform.python_version(),
+        "numpy": numpy_version,
+        "bitset_engine": clc.bitset is not None,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def save(path, repeat, results):
+    # Through a temporary file, so an interrupted write never leaves a truncated report behind
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump({"environment": environment(), "repeat": repeat, "results": results}, file,
+                  ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Benchmark the truth-table engine over formula families.")
+    parser.add_argument("--families", nargs="+", choices=sorted(FAMILIES), default=sorted(FAMILIES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[8, 12, 16, 20], help="numbers of variables")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=["table", "stream"])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the best one is kept (default: 3)")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file receiving the results")
+    args = parser.parse_args(arguments)
+
+    if max(args.sizes) > len(ascii_letters) or min(args.sizes) < 2:
+        parser.error("sizes must be between 2 and {}".format(len(ascii_letters)))
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    print("family\tvariables\tengine\tseconds\trows/s\tpeak RSS MiB")
+    for family in args.families:
+        for size in args.sizes:
+            for engine in args.engines:
+                try:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                        result = pool.submit(run_case, family, size, engine, args.repeat).result()
+                except Exception as error:
+                    # A case running out of memory or failing only loses its own line
+                    results.append({"family": family, "variables": size, "engine": engine,
+                                    "error": "{}: {}".format(type(error).__name__, error)})
+                    print("{}\t{}\t{}\tfailed ({})".format(family, size, engine, results[-1]["error"]))
+                else:
+                    results.append(result)
+                    print("{}\t{}\t{}\t{:.4f}\t{:.0f}\t{}".format(
+                        family, size, engine, result["seconds"], result["rows_per_second"] or 0,
+                        "-" if result["peak_rss_mib"] is None else "{:.1f}".format(result["peak_rss_mib"])))
+                save(args.output, args.repeat, results)
+
+    print("Results written to {}".format(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#Vectorized truth-table engine: every column is a packed array of 64-bit words,
+#bit r of the column holds the value of row r (rows ordered like product([True, False])).
+import numpy as np
+import formula
+
+
+WORD = 64
+ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# Variables whose blocks are shorter than a word repeat the same pattern in every word
+PATTERNS = {
+    0: 0x5555555555555555,
+    1: 0x3333333333333333,
+    2: 0x0F0F0F0F0F0F0F0F,
+    3: 0x00FF00FF00FF00FF,
+    4: 0x0000FFFF0000FFFF,
+    5: 0x00000000FFFFFFFF,
+}
+
+
+def variable_column(shift, start_word, words):
+    """
+    Packed column of a variable that is True while bit `shift` of the row index is 0.
+    """
+    if shift < 6:
+        return np.full(words, PATTERNS[shift], dtype=np.uint64)
+    index = np.arange(start_word, start_word + words, dtype=np.uint64)
+    blocks = (index >> np.uint64(shift - 6)) & np.uint64(1)
+    return np.where(blocks == 0, ALL, np.uint64(0))
+
+
+def tail_mask(rows):
+    """
+    Mask of the valid bits in the last word of a column holding `rows` rows.
+    """
+    remainder = rows % WORD
+    return ALL if remainder == 0 else np.uint64((1 << remainder) - 1)
+
+
+def operate(node, args, words):
+    """
+    Column of a node from the columns of its arguments, as whole-array bitwise operations.
+    """
+    if node.op == "true":
+        return np.full(words, ALL, dtype=np.uint64)
+    if node.op == "false":
+        return np.zeros(words, dtype=np.uint64)
+    if node.op == "not":
+        return ~args[0]
+    left, right = args
+    if node.op == "and":
+        return left & right
+    if node.op == "or":
+        return left | right
+    if node.op == "xor":
+        return left ^ right
+    if node.op == "implies":
+        return ~left | right
+    return ~(left ^ right)
+
+
+def evaluate(final, variables, start=0, stop=None):
+    """
+    Returns the packed columns of the variables followed by the nodes in `final`
+    for rows [start, stop). `start` must be a multiple of 64.
+    Every distinct subformula is computed once.
+    """
+    if start % WORD:
+        raise ValueError("start must be a multiple of {}".format(WORD))
+    if stop is None:
+        stop = 2 ** len(variables)
+    start_word = start // WORD
+    words = -(-(stop - start) // WORD)
+
+    columns = {}
+    for i, variable in enumerate(variables):
+        columns[variable] = variable_column(len(variables) - 1 - i, start_word, words)
+
+    def column(node):
+        return columns[node.name] if node.op == "var" else columns[node]
+
+    for node in formula.subformulas(*final):
+        columns[node] = operate(node, [column(arg) for arg in node.args], words)
+
+    mask = tail_mask(stop - start)
+    packed = [columns[variable].copy() for variable in variables]
+    packed += [column(node).copy() for node in final]
+    for values in packed:
+        values[-1] &= mask
+    return packed
+
+
+def popcount(column):
+    """
+    Number of set bits of a packed column.
+    """
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(column).sum(dtype=np.uint64))
+    return int(np.unpackbits(column.view(np.uint8)).sum(dtype=np.uint64))
+
+
+def set_bits(column):
+    """
+    Positions of the set bits of a packed column, in increasing order.
+    """
+    return np.flatnonzero(np.unpackbits(column.astype("<u8").view(np.uint8), bitorder="little"))
+
+
+def unpack(packed, rows):
+    """
+    Turns packed columns into a (rows x columns) boolean matrix.
+    """
+    matrix = np.empty((rows, len(packed)), dtype=bool)
+    for j, column in enumerate(packed):
+        bits = np.unpackbits(column.astype("<u8").view(np.uint8), bitorder="little")
+        matrix[:, j] = bits[:rows]
+    return matrix
+
+
+def eval_operations(final, variables):
+    """
+    Same contract as calculate.eval_operations: one list per row with the variables and subformulas.
+    """
+    rows = 2 ** len(variables)
+    return unpack(evaluate(final, variables), rows).tolist()
@@ -0,0 +1,157 @@
+#LRU cache in front of calculate.calculate().
+#Entries are keyed by the canonical form of the parsed expression: spacing, redundant parentheses and
+#operator spellings disappear, and variables are renamed a, b, c... in alphabetical order, so α-renamed
+#expressions share one entry and only get their header lines relabelled.
+import sys
+import threading
+from collections import OrderedDict
+from string import ascii_lowercase
+import calculate as clc
+import formula
+
+
+# Stand-in names, in the same order as the variables they replace
+CANONICAL = ascii_lowercase + "αβγδεζηθικλμνξοπρστυφχψω"
+
+
+def canonical(expression):
+    """
+    Returns the canonical expression and the {canonical name: variable} mapping back.
+    Raises ValueError when the expression does not parse or has too many variables.
+    """
+    roots = [final[-1] for variables, final in clc.prepare(expression)]
+    names = formula.variables(*roots)
+    if len(names) > len(CANONICAL):
+        raise ValueError("Too many variables to cache")
+    renaming = dict(zip(names, CANONICAL))
+    key = "≡".join(formula.render(root, renaming) for root in roots)
+    return key, {new: old for old, new in renaming.items()}
+
+
+def relabel(text, back):
+    """
+    Puts the real variable names back in the header and simplification lines of a cached table.
+    """
+    table = str.maketrans(back)
+    lines = []
+    for line in text.split("\n"):
+        if line.startswith(clc.SIMPLIFIED):
+            line = clc.SIMPLIFIED + line[len(clc.SIMPLIFIED):].translate(table)
+        elif "N°" in line:
+            line = line.translate(table)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+class FormulaCache:
+    """
+    Least recently used results, bounded both by number of entries and by their total size in bytes.
+    Safe to share between the GUI's worker threads.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        """
+        Stores value under key. `size` overrides sys.getsizeof for containers.
+        """
+        if size is None:
+            size = sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                oldest, (dropped, dropped_size) = self.entries.popitem(last=False)
+                self.bytes -= dropped_size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+        }
+
+
+default = FormulaCache()
+
+# Result columns of the tables computed through calculate(), for views drawn from them (see kmap.py)
+columns = FormulaCache(max_entries=32)
+
+
+def store_columns(key, found, store):
+    variables, sides = found
+    store.put(key, found, sum(len(column) for side, column in sides))
+
+
+def calculate(expression, cache=None, progress=None, store=None):
+    """
+    clc.calculate() through the cache. Invalid expressions and cancelled tables are not cached.
+    The result columns of the table are kept in `store` (default: columns).
+    """
+    if cache is None:
+        cache = default
+    if store is None:
+        store = columns
+    try:
+        key, back = canonical(expression)
+    except ValueError:
+        return clc.calculate(expression, progress=progress)
+
+    result = cache.get(key)
+    if result is None:
+        found = []
+        result = clc.calculate(key, progress=progress, columns=found)
+        cache.put(key, result)
+        store_columns(key, found, store)
+    return relabel(result, back)
+
+
+def result_columns(expression, store=None, start=0, stop=None):
+    """
+    clc.result_columns() with the real variable names, reusing the columns of a table computed by calculate().
+    With `stop`, only rows [start, stop): cut from the stored columns, or evaluated alone and not stored.
+    Raises ValueError on malformed expressions.
+    """
+    if store is None:
+        store = columns
+    key, back = canonical(expression)
+    found = store.get(key)
+    if found is None and stop is not None:
+        found = clc.result_columns(key, start=start, stop=stop)
+    elif found is None:
+        found = clc.result_columns(key)
+        store_columns(key, found, store)
+    elif stop is not None:
+        found = found[0], [(side, column[start:stop]) for side, column in found[1]]
+    variables, sides = found
+    table = str.maketrans(back)
+    return [back[name] for name in variables], [(side.translate(table), column) for side, column in sides]
@@ -1,89 +1,738 @@
+import csv
+import json
+import random
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from itertools import product
 from tabulate import tabulate
+import formula
+import gray
+import sat
+import bdd
+import minimize
+import simplify
 
+try:
+    import bitset
+except ImportError:  # NumPy is not installed, tables are evaluated row by row
+    bitset = None
 
-i = 0
-def calculate(expression):
+
+# From this many variables on, tables are evaluated as packed bit columns (see bitset.py)
+BITSET_THRESHOLD = 10
+
+# Rows evaluated at a time when streaming a table
+CHUNK_SIZE = 65536
+
+# Checks build a BDD up to this many nodes, then hand the formula to the SAT solver
+BDD_LIMIT = 200000
+
+# Without a BDD, models are counted by popcounting the bitset engine's result column, up to this many variables
+COUNT_LIMIT = 30
+
+# Rows of the result column popcounted at a time
+COUNT_CHUNK = 1 << 20
+
+# Progress callbacks are called about this many times per table
+PROGRESS_STEPS = 100
+
+INVALID = "Invalid expression. Please check parentheses and operators."
+
+# Starts the line showing a side's simplified formula above its table
+SIMPLIFIED = "Simplified: "
+
+
+class Cancelled(Exception):
     """
-    Takes a logical expression as input and returns the formatted truth table.
+    Raised by a progress callback to stop a computation partway through.
     """
-    # Validate expression
-    if expression.count("(") != expression.count(")") or expression.count("≡") > 1:
-        return "Invalid expression. Please check parentheses and operators."
-
-    # Split by equivalence (≡)
-    division = expression.split("≡")
-
-    comparative = []
-    check_variables = []
-
-    def divide_expressions(string):
-        stack = []
-        subexpressions = {}
-        results = []
-
-        for char in string:
-            if char == "(":
-                stack.append(len(stack) + 1)
-                subexpressions[stack[-1]] = "("
-            elif char == ")":
-                level = stack.pop()
-                subexpressions[level] += ")"
-            else:
-                if stack:
-                    subexpressions[stack[-1]] += char
 
-        for level in sorted(subexpressions.keys(), reverse=True):
-            expr = subexpressions[level]
-            if expr not in results:
-                results.append(expr)
 
-        results.sort(key=lambda x: "not" in x)
+def positional(final, variables):
+    """
+    Maps the variable nodes of the subformulas to v0, v1, ... by their position in `variables`: the names
+    themselves may not be valid, or distinct, Python identifiers once Python normalizes them.
+    """
+    names = {}
+    for node in formula.subformulas(*final) + list(final):
+        for var in [node] + list(node.args):
+            if var.op == "var":
+                names[var] = "v{}".format(variables.index(var.name))
+    return names
 
-        if string not in results:
-            results.append(string)
 
-        return results
+def compile_expressions(final, variables):
+    """
+    Compiles the subformulas into a single function, so the formula is parsed once
+    and each row costs one call returning the tuple of column values.
+    Shared subformulas are computed once per row.
+    """
+    names = positional(final, variables)
+    lines = ["def row({}):".format(", ".join("v{}".format(i) for i in range(len(variables))))]
+    for k, node in enumerate(formula.subformulas(*final)):
+        lines.append("    _{} = {}".format(k, formula.to_python(node, names)))
+        names[node] = "_{}".format(k)
+    lines.append("    return ({},)".format(", ".join(formula.to_python(node, names) for node in final)))
 
-    def eval_operations(final, variables):
-        data = [[] for _ in range(len(final))]
-        states = product([True, False], repeat=len(variables))
+    namespace = {}
+    exec(compile("\n".join(lines), "<expression>", "exec"), namespace)
+    return namespace["row"]
 
-        information = []
+
+def eval_operations(final, variables, compiled=True):
+    states = product([True, False], repeat=len(variables))
+
+    information = []
+    if compiled:
+        function = compile_expressions(final, variables)
         for state in states:
-            instance = dict(zip(variables, state))
-            information.append([instance[i] for i in variables])
-            for j, exp in enumerate(final):
-                valor = eval(exp, instance)
-                data[j].append(valor)
+            information.append(list(state) + list(function(*state)))
+        return information
+
+    # Legacy path: re-parses the source of every subformula for every row, kept for benchmark.py
+    sources = [formula.to_python(node, positional(final, variables)) for node in final]
+    data = [[] for _ in range(len(final))]
+    for state in states:
+        instance = {"v{}".format(i): value for i, value in enumerate(state)}
+        information.append(list(state))
+        for j, exp in enumerate(sources):
+            valor = eval(exp, instance)
+            data[j].append(valor)
+
+    for i in range(len(information)):
+        for j in range(len(data)):
+            information[i].append(data[j][i])
+
+    return information
 
-        for i in range(len(information)):
-            for j in range(len(data)):
-                information[i].append(data[j][i])
 
+def evaluate(final, variables, workers=None, progress=None):
+    """
+    Evaluates the table with the bitset engine when it is available and worth it, row by row otherwise:
+    in Gray-code order when few subformulas depend on each variable (see gray.py), all of them per row if not.
+    `workers` splits the rows between that many processes.
+    `progress(rows done, rows)` is called after every chunk of rows and may raise Cancelled.
+    """
+    if progress is not None:
+        rows = 2 ** len(variables)
+        information = []
+        for chunk in iter_rows(variables, final, max(rows // PROGRESS_STEPS, 1), workers):
+            information += chunk
+            progress(len(information), rows)
         return information
+    if workers and workers > 1:
+        return [row for chunk in iter_rows(variables, final, CHUNK_SIZE, workers) for row in chunk]
+    if bitset is not None and len(variables) >= BITSET_THRESHOLD:
+        return bitset.eval_operations(final, variables)
+    if gray.worthwhile(final, variables):
+        return gray.eval_operations(final, variables)
+    return eval_operations(final, variables)
+
+
+def result_column(variables, root):
+    """
+    Values of the formula for every row of the table, in table order.
+    """
+    if bitset is not None and len(variables) >= BITSET_THRESHOLD:
+        packed = bitset.evaluate([root], variables)[-1:]
+        return bitset.unpack(packed, 2 ** len(variables))[:, 0].tolist()
+    if gray.worthwhile([root], variables):
+        return [row[-1] for row in gray.eval_operations([root], variables)]
+    return [row[-1] for row in eval_operations([root], variables)]
+
+
+def result_slice(variables, root, start, stop):
+    """
+    Values of the formula for rows [start, stop) of the table only, for views of a part of a big table.
+    """
+    if bitset is not None and len(variables) >= BITSET_THRESHOLD:
+        first = start - start % bitset.WORD
+        packed = bitset.evaluate([root], variables, first, stop)[-1:]
+        return bitset.unpack(packed, stop - first)[start - first:, 0].tolist()
+    return [row[-1] for row in chunk_rows(variables, [root], start, stop)]
+
+
+def evaluate_sides(sides, workers=None, progress=None):
+    """
+    Evaluates all the sides in a single pass over the union of their variables, so a variable they share is
+    enumerated once and a subformula they share is computed once for all of them.
+    Returns the variables, the distinct columns of all the sides, the table over them, and the number of
+    subformula columns and cells that did not need to be computed.
+    `progress(rows done, rows)` follows the evaluation.
+    """
+    variables = sorted(set().union(*(variables for variables, final in sides)))
+    shared = list(dict.fromkeys(node for variables, final in sides for node in final))
+    information = evaluate(shared, variables, workers, progress)
+
+    # Every operator written in the sides would otherwise be a column evaluation of its own
+    saved = formula.occurrences(*(final[-1] for variables, final in sides)) - len(formula.subformulas(*shared))
+    return variables, shared, information, saved, saved * len(information)
+
+
+def agreement(columns):
+    """
+    Groups the indexes of identical columns, in order of first appearance: the sides that agree on every row.
+    """
+    groups = {}
+    for index, column in enumerate(columns):
+        groups.setdefault(bytes(column), []).append(index)
+    return list(groups.values())
+
+
+def agreement_text(groups):
+    return "Sides agreeing on every row (numbered from the left): " + " | ".join(
+        " ≡ ".join(str(index + 1) for index in group) for group in groups)
+
+
+def change_tf(information):
+    return [['T' if val else 'F' for val in row] for row in information]
+
+
+def prepare(expression, simplified=False):
+    """
+    Splits the expression by equivalence (≡), any number of times, parses every side and returns its variables
+    and subformulas. The sides share one Formula table, so equal subformulas are the same node.
+    With `simplified`, every side is rewritten by simplify.py first; its variables stay those of the expression.
+    Raises ValueError on malformed expressions.
+    """
+    table = formula.Formula()
+    sides = []
+    for instance in expression.split("≡"):
+        root = table.parse(instance)
+        variables = formula.variables(root)
+        if simplified:
+            root = simplify.simplify(table, root)
+        sides.append((variables, formula.subformulas(root) or [root]))
+    return sides
+
+
+def states(count, start, stop):
+    """
+    Assignments of rows [start, stop) in table order, without walking the rows before start.
+    """
+    low = min(count, 8)
+    tail = list(product([True, False], repeat=low))
+    for block in range(start >> low, ((stop - 1) >> low) + 1):
+        prefix = tuple(not (block >> (count - low - 1 - i)) & 1 for i in range(count - low))
+        first = max(start - (block << low), 0)
+        last = min(stop - (block << low), 1 << low)
+        for suffix in tail[first:last]:
+            yield prefix + suffix
+
+
+def chunk_rows(variables, final, start, stop):
+    """
+    Rows [start, stop) of a table. `start` must be a multiple of 64 when the bitset engine is used.
+    """
+    if bitset is not None and len(variables) >= BITSET_THRESHOLD:
+        return bitset.unpack(bitset.evaluate(final, variables, start, stop), stop - start).tolist()
+    if gray.worthwhile(final, variables):
+        return gray.chunk_rows(variables, final, start, stop)
+    function = compile_expressions(final, variables)
+    return [list(state) + list(function(*state)) for state in states(len(variables), start, stop)]
+
+
+def format_rows(rows, start):
+    return "".join(str(index) + "\t" + "\t".join(['T' if val else 'F' for val in row]) + "\n"
+                   for index, row in enumerate(rows, start))
+
+
+def agreeing(rows, variables, compare):
+    """
+    The rows with the "≡" column appended: whether the sides, at positions `compare` of the columns, agree on the row.
+    """
+    first = len(variables)
+    return [row + [len({row[first + j] for j in compare}) == 1] for row in rows]
+
+
+def side_labels(rows, variables, compare):
+    """
+    For every side, the first side with the same values over these rows.
+    """
+    columns = [bytes(row[len(variables) + j] for row in rows) for j in compare]
+    return [columns.index(column) for column in columns]
+
+
+def refine(groups, labels):
+    """
+    Splits the groups of agreeing sides by the labels of one more chunk of rows (see side_labels).
+    """
+    refined = []
+    for group in groups:
+        split = {}
+        for index in group:
+            split.setdefault(labels[index], []).append(index)
+        refined += split.values()
+    return sorted(refined)
+
+
+def chunk_tsv(variables, final, start, stop, compare=None):
+    """
+    TSV lines of rows [start, stop), so worker processes also take care of the formatting.
+    With `compare`, returns them with the side labels of the rows (see side_labels).
+    """
+    rows = chunk_rows(variables, final, start, stop)
+    if compare is None:
+        return format_rows(rows, start)
+    return format_rows(agreeing(rows, variables, compare), start), side_labels(rows, variables, compare)
+
+
+def chunks(variables, chunk_size=None):
+    """
+    (start, stop) ranges covering the table, aligned to the bitset engine's words when it is used.
+    """
+    rows = 2 ** len(variables)
+    size = chunk_size or CHUNK_SIZE
+    if bitset is not None and len(variables) >= BITSET_THRESHOLD:
+        size = max(bitset.WORD, size // bitset.WORD * bitset.WORD)
+    return [(start, min(start + size, rows)) for start in range(0, rows, size)]
+
+
+def run_chunks(function, variables, final, ranges, workers=None):
+    """
+    Yields function(variables, final, start, stop) for every range, in order.
+    With workers > 1 the ranges are evaluated by a process pool, keeping a bounded number of chunks in flight.
+    """
+    if not workers or workers < 2 or len(ranges) < 2:
+        for start, stop in ranges:
+            yield function(variables, final, start, stop)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for start, stop in ranges:
+            pending.append(pool.submit(function, variables, final, start, stop))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_rows(variables, final, chunk_size=None, workers=None):
+    """
+    Yields the rows of a table one at a time, or lists of up to `chunk_size` rows,
+    holding only the chunks being computed in memory. `workers` evaluates chunks in parallel processes.
+    """
+    for chunk in run_chunks(chunk_rows, variables, final, chunks(variables, chunk_size), workers):
+        if chunk_size:
+            yield chunk
+        else:
+            yield from chunk
+
+
+def unified(expression, simplified=False):
+    """
+    The single table of all the sides, as calculate() builds it: (variables, columns, compare), where the variables
+    are the union of the sides' ones, the columns their distinct subformulas, and `compare` the positions of the
+    sides in the columns, or None when there is only one. Raises ValueError on malformed expressions.
+    """
+    sides = prepare(expression, simplified)
+    variables = sorted(set().union(*(variables for variables, final in sides)))
+    shared = list(dict.fromkeys(node for variables, final in sides for node in final))
+    compare = [shared.index(final[-1]) for variables, final in sides] if len(sides) > 1 else None
+    return variables, shared, compare
+
+
+def headers(variables, final, compare):
+    """
+    The column names of a unified table (see unified), after the row number.
+    """
+    return variables + [str(node) for node in final] + (["≡"] if compare else [])
+
+
+def write_tsv(expression, file=sys.stdout, chunk_size=CHUNK_SIZE, workers=None):
+    """
+    Writes the truth table as TSV while it is being generated, so memory stays constant whatever the number
+    of variables. The sides of ≡ share the table, followed by the line telling which ones agree.
+    """
+    variables, final, compare = unified(expression)
+    file.write("\t".join(["N°"] + headers(variables, final, compare)) + "\n")
+    ranges = chunks(variables, chunk_size)
+    if compare is None:
+        for lines in run_chunks(chunk_tsv, variables, final, ranges, workers):
+            file.write(lines)
+        return
+    groups = [list(range(len(compare)))]
+    for lines, labels in run_chunks(partial(chunk_tsv, compare=compare), variables, final, ranges, workers):
+        file.write(lines)
+        groups = refine(groups, labels)
+    file.write("\n" + agreement_text(groups) + "\n")
+
+
+class LazyTable:
+    """
+    Table whose rows are only computed when asked for, so a view can show any window of it without building the rest.
+    `compare` lists the positions in `final` of the sides of ≡, which get an extra "≡" column telling whether they agree.
+    """
+
+    def __init__(self, variables, final, compare=None):
+        self.variables = variables
+        self.final = final
+        self.compare = compare
+        self.headers = ["N°"] + headers(variables, final, compare)
+        self.rows = 2 ** len(variables)
+        self.function = compile_expressions(final, variables)
+
+    def window(self, start, stop):
+        """
+        Rows [start, stop), clipped to the table.
+        """
+        stop = min(stop, self.rows)
+        if start >= stop:
+            return []
+        rows = []
+        for state in states(len(self.variables), start, stop):
+            values = self.function(*state)
+            row = list(state) + list(values)
+            if self.compare:
+                row.append(len({values[j] for j in self.compare}) == 1)
+            rows.append(row)
+        return rows
+
+
+def lazy_tables(expression, simplified=True):
+    """
+    The table calculate() shows for the expression, as a LazyTable: every side over the union of their variables.
+    Raises ValueError on malformed expressions.
+    """
+    return [LazyTable(*unified(expression, simplified))]
+
+
+def agreeing_chunks(variables, final, compare, chunk_size=CHUNK_SIZE, workers=None, groups=None):
+    """
+    Yields the chunks of rows of a unified table (see unified) with their "≡" column.
+    `groups`, when given a list, ends up holding the groups of sides agreeing on every row.
+    """
+    agreement = [list(range(len(compare)))] if compare else []
+    for chunk in iter_rows(variables, final, chunk_size, workers):
+        if compare:
+            agreement = refine(agreement, side_labels(chunk, variables, compare))
+            chunk = agreeing(chunk, variables, compare)
+        yield chunk
+    if groups is not None:
+        groups.extend(agreement)
+
+
+def write_csv(expression, file=sys.stdout, chunk_size=CHUNK_SIZE, workers=None):
+    """
+    Same as write_tsv with comma-separated values, quoting headers when needed.
+    """
+    writer = csv.writer(file, lineterminator="\n")
+    variables, final, compare = unified(expression)
+    writer.writerow(["N°"] + headers(variables, final, compare))
+    index = 0
+    groups = []
+    for chunk in agreeing_chunks(variables, final, compare, chunk_size, workers, groups):
+        writer.writerows([index + k] + ['T' if val else 'F' for val in row] for k, row in enumerate(chunk))
+        index += len(chunk)
+    if compare:
+        file.write("\n" + agreement_text(groups) + "\n")
+
+
+def write_json(expression, file=sys.stdout, chunk_size=CHUNK_SIZE, workers=None):
+    """
+    Writes {"expression": ..., "variables": [...], "headers": [...], "rows": [[true, ...], ...]}, streaming the rows
+    like write_tsv. With several sides of ≡, the rows end with the "≡" column and "agreement" lists the groups of
+    sides (numbered from 1) agreeing on every row.
+    """
+    variables, final, compare = unified(expression)
+    file.write('{{"expression": {}, "variables": {}, "headers": {}, "rows": ['.format(
+        json.dumps(expression, ensure_ascii=False), json.dumps(variables, ensure_ascii=False),
+        json.dumps(headers(variables, final, compare), ensure_ascii=False)))
+    first = True
+    groups = []
+    for chunk in agreeing_chunks(variables, final, compare, chunk_size, workers, groups):
+        text = ", ".join(json.dumps(row) for row in chunk)
+        file.write(text if first else ", " + text)
+        first = False
+    file.write("]")
+    if compare:
+        file.write(', "agreement": {}'.format(json.dumps([[index + 1 for index in group] for group in groups])))
+    file.write("}\n")
+
+
+def describe(assignment):
+    return ", ".join("{}={}".format(name, 'T' if val else 'F') for name, val in sorted(assignment.items()))
+
+
+def equivalent(left, right, progress=None):
+    """
+    (True, None) when both formulas agree on every row, (False, counterexample) otherwise.
+    Canonical BDDs answer with a pointer comparison, the SAT solver takes over when they grow too large.
+    `progress` is handed to both and may raise Cancelled.
+    """
+    try:
+        manager = bdd.BDD(bdd.order(left, right), limit=BDD_LIMIT, progress=progress)
+        a, b = manager.build(left), manager.build(right)
+        if a == b:
+            return True, None
+        return False, manager.pick(manager.apply("xor", a, b))
+    except bdd.LimitExceeded:
+        return sat.equivalent(left, right, progress)
+
+
+def tautology(root, progress=None):
+    """
+    Returns (is a tautology, counterexample, example), where the example satisfies the formula.
+    """
+    try:
+        manager = bdd.BDD(bdd.order(root), limit=BDD_LIMIT, progress=progress)
+        u = manager.build(root)
+        return u == bdd.TRUE, manager.pick(manager.negate(u)), manager.pick(u)
+    except bdd.LimitExceeded:
+        always, counterexample = sat.tautology(root, progress)
+        return always, counterexample, sat.satisfiable(root, progress)
+
+
+def classes(roots, progress=None):
+    """
+    Groups the indexes of the formulas that agree on every row. One BDD over the variables of all of them
+    answers with node identities; when it grows too large, the SAT solver compares every formula with
+    the first one of each group.
+    """
+    try:
+        manager = bdd.BDD(bdd.order(*roots), limit=BDD_LIMIT, progress=progress)
+        groups = {}
+        for index, root in enumerate(roots):
+            groups.setdefault(manager.build(root), []).append(index)
+        return list(groups.values())
+    except bdd.LimitExceeded:
+        groups = []
+        for index, root in enumerate(roots):
+            for group in groups:
+                if sat.equivalent(roots[group[0]], root, progress)[0]:
+                    group.append(index)
+                    break
+            else:
+                groups.append([index])
+        return groups
+
+
+def check(expression, progress=None):
+    """
+    Tells whether the sides of ≡ are equivalent (grouping the ones that agree when there are more than two),
+    or whether a single expression is a tautology and satisfiable, with a counterexample or example assignment.
+    The table is never enumerated. `progress` follows the BDDs and the SAT solver; raising Cancelled from it stops them.
+    A side may be a bare variable (python -m doctest calculate.py):
+
+    >>> check("p∧q ≡ r")
+    'Equivalent: no. Counterexample: p=T, q=T, r=F (p∧q is T, r is F).'
+    >>> print(check("p ≡ q ≡ r∧q"))
+    Equivalent: no. Sides agreeing on every row (numbered from the left): 1 | 2 | 3
+    Side 1 vs side 2: p=T, q=F (p is T, q is F).
+    Side 1 vs side 3: p=F, q=T, r=T (p is F, r∧q is T).
+    """
+    try:
+        sides = prepare(expression)
+    except ValueError as error:
+        return "{} ({})".format(INVALID, error)
+
+    roots = [final[-1] for variables, final in sides]
+    if len(roots) == 2:
+        same, counterexample = equivalent(*roots, progress=progress)
+        if same:
+            return "Equivalent: yes, {} ≡ {} holds for every row.".format(*roots)
+        values = ['T' if formula.evaluate(root, counterexample) else 'F' for root in roots]
+        return "Equivalent: no. Counterexample: {} ({} is {}, {} is {}).".format(
+            describe(counterexample), roots[0], values[0], roots[1], values[1])
+    if len(roots) > 2:
+        groups = classes(roots, progress)
+        if len(groups) == 1:
+            return "Equivalent: yes, all {} sides agree on every row.".format(len(roots))
+        lines = ["Equivalent: no. " + agreement_text(groups)]
+        first = roots[groups[0][0]]
+        for group in groups[1:]:
+            other = roots[group[0]]
+            same, counterexample = equivalent(first, other, progress)
+            lines.append("Side {} vs side {}: {} ({} is {}, {} is {}).".format(
+                groups[0][0] + 1, group[0] + 1, describe(counterexample),
+                first, 'T' if formula.evaluate(first, counterexample) else 'F',
+                other, 'T' if formula.evaluate(other, counterexample) else 'F'))
+        return "\n".join(lines)
+
+    root = roots[0]
+    always, counterexample, example = tautology(root, progress)
+    if always:
+        return "Tautology: yes, {} is true for every row.".format(root)
+    if example is None:
+        return "Tautology: no, {} is a contradiction (false for every row).".format(root)
+    return "Tautology: no. Counterexample: {}.\nSatisfiable: yes. Example: {}.".format(
+        describe(counterexample), describe(example))
+
+
+def row_assignment(variables, row):
+    """
+    Assignment of the variables at a row of the table.
+    """
+    count = len(variables)
+    return {name: not (row >> (count - 1 - i)) & 1 for i, name in enumerate(variables)}
+
+
+def result_words(root, variables, start, stop):
+    """
+    Packed result column of rows [start, stop), for formulas whose BDD is too large.
+    """
+    if bitset is None or len(variables) > COUNT_LIMIT:
+        raise ValueError("Too large to count: the BDD exceeds {} nodes".format(BDD_LIMIT))
+    return bitset.evaluate([root], variables, start, stop)[-1]
+
+
+def count_models(root):
+    """
+    Number of rows of the table where the formula is true (#SAT), without building the table:
+    path counting on its BDD, or the popcount of the packed result column, chunk by chunk, when the BDD grows too large.
+    """
+    try:
+        manager = bdd.BDD(bdd.order(root), limit=BDD_LIMIT)
+        return manager.count(manager.build(root))
+    except bdd.LimitExceeded:
+        variables = formula.variables(root)
+        return sum(bitset.popcount(result_words(root, variables, start, stop))
+                   for start, stop in chunks(variables, COUNT_CHUNK))
 
-    def change_tf(information):
-        return [['T' if val else 'F' for val in row] for row in information]
 
-    operators = {"∧": " & ", "∨": " or ", "¬": " not ", "⨁": " ^ ", "→": " <= ", "↔": " == "}
+def sample_models(root, count=10, seed=None):
+    """
+    `count` satisfying assignments drawn uniformly at random (with replacement), empty for a contradiction.
+    Without a BDD, random ranks among the models are looked up in the popcounts of the result column's chunks.
+    """
+    rng = random.Random(seed)
+    try:
+        manager = bdd.BDD(bdd.order(root), limit=BDD_LIMIT)
+        return manager.sample(manager.build(root), count, rng)
+    except bdd.LimitExceeded:
+        pass
+
+    variables = formula.variables(root)
+    ranges = chunks(variables, COUNT_CHUNK)
+    sizes = [bitset.popcount(result_words(root, variables, start, stop)) for start, stop in ranges]
+    total = sum(sizes)
+    if not total:
+        return []
+    ranks = [rng.randrange(total) for _ in range(count)]
+
+    rows = {}
+    before = 0
+    for (start, stop), size in zip(ranges, sizes):
+        wanted = [rank for rank in ranks if before <= rank < before + size]
+        if wanted:
+            bits = bitset.set_bits(result_words(root, variables, start, stop))
+            for rank in wanted:
+                rows[rank] = start + int(bits[rank - before])
+        before += size
+    return [row_assignment(variables, rows[rank]) for rank in ranks]
+
+
+def models(expression, samples=10, seed=None):
+    """
+    How many rows make every side true, and a few of them drawn uniformly at random.
+    """
+    try:
+        sides = prepare(expression)
+    except ValueError as error:
+        return "{} ({})".format(INVALID, error)
+
+    results = []
+    for variables, final in sides:
+        root = final[-1]
+        try:
+            total = count_models(root)
+        except ValueError as error:
+            results.append("{}\n{}".format(root, error))
+            continue
+        rows = 2 ** len(variables)
+        lines = [str(root), "Satisfying rows: {} of {} ({:.4g}%)".format(total, rows, 100 * total / rows)]
+        if total and samples:
+            lines.append("Random satisfying rows:")
+            lines += ["  " + describe(assignment) for assignment in sample_models(root, samples, seed)]
+        results.append("\n".join(lines))
+    return "\n\n".join(results)
+
+
+def minimal_forms(expression, progress=None):
+    """
+    Minimal DNF and CNF equivalent to every side, synthesized from its result column.
+    `progress(steps done, steps)` is called after the column, the DNF and the CNF of every side,
+    and repeated while a cover is searched so a cancellation is noticed inside a step.
+    """
+    try:
+        sides = prepare(expression)
+    except ValueError as error:
+        return "{} ({})".format(INVALID, error)
+
+    def step(done):
+        if progress is not None:
+            progress(done, 3 * len(sides))
 
     results = []
-    for instance in division:
-        format = instance
-        variables = sorted(set(filter(str.isalpha, format)))
-        check_variables.append(variables)
+    for number, (variables, final) in enumerate(sides):
+        column = result_column(variables, final[-1])
+        step(3 * number + 1)
+        dnf = minimize.dnf(variables, column, lambda done, total: step(3 * number + 1))
+        step(3 * number + 2)
+        cnf = minimize.cnf(variables, column, lambda done, total: step(3 * number + 2))
+        step(3 * number + 3)
+        results.append("{}\nMinimal DNF: {}\nMinimal CNF: {}".format(final[-1], dnf, cnf))
+    return "\n\n".join(results)
+
+
+def result_columns(expression, simplified=True, start=0, stop=None):
+    """
+    (variables, [(side, result column as bytes)]) over the union of the sides' variables, in table order,
+    for views that only need the results. With `stop`, the columns only hold rows [start, stop).
+    Raises ValueError on malformed expressions.
+    """
+    sides = prepare(expression, simplified)
+    variables = sorted(set().union(*(variables for variables, final in sides)))
+    if stop is None:
+        return variables, [(str(side[1][-1]), bytes(result_column(variables, side[1][-1]))) for side in sides]
+    return variables, [(str(side[1][-1]), bytes(result_slice(variables, side[1][-1], start, stop))) for side in sides]
+
+
+def calculate(expression, workers=None, progress=None, simplified=True, columns=None):
+    """
+    Takes a logical expression as input and returns the formatted truth table.
+    `workers` evaluates the rows in that many processes.
+    `progress(rows done, rows)` follows the evaluation; raising Cancelled from it stops the table.
+    With `simplified`, the table is the one of the simplified formula, shown above it when it changed.
+    `columns`, when given a list, is extended with what result_columns() returns, taken from the table just computed.
+    """
+    # Validate expression
+    try:
+        sides = prepare(expression, simplified)
+        written = prepare(expression) if simplified else sides
+    except ValueError as error:
+        return "{} ({})".format(INVALID, error)
+
+    variables, shared, information, saved, cells = evaluate_sides(sides, workers, progress)
+
+    notes = ["{}{} ⇒ {}".format(SIMPLIFIED, original[-1], final[-1])
+             for (_, final), (_, original) in zip(sides, written) if str(final[-1]) != str(original[-1])]
 
-        for key, value in operators.items():
-            format = format.replace(key, value)
+    if columns is not None:
+        positions = [len(variables) + shared.index(side[1][-1]) for side in sides]
+        columns.extend((variables, [(str(side[1][-1]), bytes(row[j] for row in information))
+                                    for side, j in zip(sides, positions)]))
 
-        final = divide_expressions(format)
-        information = eval_operations(final, variables)
-        information_in_tf = change_tf(information)
+    headers = ["N°"] + variables + [str(node) for node in shared]
+    groups = None
+    if len(sides) > 1:
+        # Every side is a column of the same table: the "≡" column tells whether they all agree on the row
+        positions = [len(variables) + shared.index(side[1][-1]) for side in sides]
+        side_columns = [[row[j] for row in information] for j in positions]
+        groups = agreement(side_columns)
+        information = [row + [len({row[j] for j in positions}) == 1] for row in information]
+        headers.append("≡")
 
-        headers = ["N°"] + variables + final
-        table = tabulate(information_in_tf, headers=headers, showindex="always", numalign="right", stralign="center", tablefmt="tsv")
+    information_in_tf = change_tf(information)
+    table = tabulate(information_in_tf, headers=headers, showindex="always", numalign="right", stralign="center", tablefmt="tsv")
 
-        results.append(table)
+    results = ["\n".join(notes + [table])]
+    if groups is not None:
+        results.append(agreement_text(groups))
+    if saved:
+        results.append("Shared subformulas: {} column evaluations saved ({} cells).".format(saved, cells))
 
     return "\n\n".join(results)
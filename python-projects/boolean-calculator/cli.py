@@ -0,0 +1,138 @@
+#Headless batch entry point: evaluates many expressions without the Tk window.
+#Usage: python cli.py [FILE] [--format tsv|csv|json|bin] [--mode table|check|minimize|count|kmap] [--samples N] [--output DIR] [--jobs N] [--workers N]
+#Expressions are read one per line from FILE or stdin; blank lines and lines starting with # are skipped.
+#Timings are reported on stderr, one line per expression.
+#--format bin writes packed binary tables (see tablefile.py) and needs --output.
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import calculate as clc
+import kmap
+
+try:
+    import tablefile
+except ImportError:  # NumPy is not installed, binary tables are not available
+    tablefile = None
+
+
+WRITERS = {"tsv": clc.write_tsv, "csv": clc.write_csv, "json": clc.write_json}
+EXTENSIONS = {"tsv": "tsv", "csv": "csv", "json": "json", "bin": "ttbl"}
+
+
+def read_expressions(file):
+    return [line.strip() for line in file if line.strip() and not line.lstrip().startswith("#")]
+
+
+def run(index, expression, mode, format, output, workers, samples=10):
+    """
+    Evaluates one expression. Returns (index, expression, seconds, rows, text, error); `text` is None when
+    the result was written to a file in `output`, `error` is the message to report when the expression failed
+    for any reason: the invalid expression notice for malformed input, the error type otherwise.
+    """
+    start = time.perf_counter()
+    try:
+        variables, final, compare = clc.unified(expression)
+        rows = 2 ** len(variables)
+        if mode == "check":
+            result = clc.check(expression) + "\n"
+        elif mode == "minimize":
+            result = clc.minimal_forms(expression) + "\n"
+        elif mode == "count":
+            result = clc.models(expression, samples) + "\n"
+        elif mode == "kmap":
+            result = kmap.show(expression) + "\n"
+        else:
+            result = None
+
+        if output:
+            extension = EXTENSIONS[format] if mode == "table" else "txt"
+            path = os.path.join(output, "{:05d}.{}".format(index, extension))
+            if result is None and format == "bin":
+                tablefile.write(expression, path, workers=workers)
+                return index, expression, time.perf_counter() - start, rows, None, None
+            with open(path, "w", encoding="utf-8", newline="") as file:
+                if result is None:
+                    WRITERS[format](expression, file, workers=workers)
+                else:
+                    file.write(result)
+            text = None
+        elif result is None:
+            buffer = io.StringIO()
+            WRITERS[format](expression, buffer, workers=workers)
+            text = buffer.getvalue()
+        else:
+            text = result
+        return index, expression, time.perf_counter() - start, rows, text, None
+    except ValueError as error:
+        return index, expression, time.perf_counter() - start, 0, None, "{} ({})".format(clc.INVALID, error)
+    except Exception as error:
+        # A recursion or memory error only fails its own expression, the batch goes on
+        message = "{}: {}".format(type(error).__name__, error) if str(error) else type(error).__name__
+        return index, expression, time.perf_counter() - start, 0, None, "Error: " + message
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Evaluate logical expressions in batch, one per line.")
+    parser.add_argument("file", nargs="?", help="file with one expression per line (default: stdin)")
+    parser.add_argument("--format", choices=sorted(EXTENSIONS), default="tsv", help="table format (default: tsv)")
+    parser.add_argument("--mode", choices=["table", "check", "minimize", "count", "kmap"], default="table",
+                        help="truth table, equivalence/tautology check, minimal DNF/CNF, number of "
+                             "satisfying rows or Karnaugh map (default: table)")
+    parser.add_argument("--samples", type=int, default=10,
+                        help="random satisfying rows shown by --mode count (default: 10)")
+    parser.add_argument("--output", help="directory receiving one file per expression (default: stdout)")
+    parser.add_argument("--jobs", type=int, default=1, help="expressions evaluated in parallel (default: 1)")
+    parser.add_argument("--workers", type=int, default=None, help="processes sharing the rows of each table")
+    args = parser.parse_args(arguments)
+    if args.format == "bin" and args.mode == "table":
+        if tablefile is None:
+            parser.error("--format bin needs NumPy")
+        if not args.output:
+            parser.error("--format bin needs --output")
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as file:
+            expressions = read_expressions(file)
+    else:
+        expressions = read_expressions(sys.stdin)
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+
+    tasks = [(index, expression, args.mode, args.format, args.output, args.workers, args.samples)
+             for index, expression in enumerate(expressions)]
+    start = time.perf_counter()
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = pool.map(run, *zip(*tasks)) if tasks else []
+            failures = report(results)
+    else:
+        failures = report(run(*task) for task in tasks)
+
+    print("total\t{:.4f}\t{} expressions\t{} failed".format(time.perf_counter() - start, len(tasks), failures),
+          file=sys.stderr)
+    return 1 if failures else 0
+
+
+def report(results):
+    """
+    Prints every result in input order as it arrives, with its timing on stderr. Returns the number of failures.
+    """
+    failures = 0
+    print("N°\tseconds\trows\texpression", file=sys.stderr)
+    for index, expression, seconds, rows, text, error in results:
+        if error is not None:
+            failures += 1
+            print("{}\t{:.4f}\t-\t{}\t{}".format(index, seconds, expression, error), file=sys.stderr)
+            continue
+        if text is not None:
+            sys.stdout.write(text)
+            sys.stdout.write("\n")
+        print("{}\t{:.4f}\t{}\t{}".format(index, seconds, rows, expression), file=sys.stderr)
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(main())
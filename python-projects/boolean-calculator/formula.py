@@ -0,0 +1,293 @@
+#Tokenizer and operator-precedence (Pratt) parser for logical expressions.
+#Formulas are hash-consed: every distinct subformula is a single Node shared by all its occurrences.
+
+# Symbols accepted for every operator, the first one is used when printing
+SYMBOLS = {
+    "not": ["¬", "~", "!"],
+    "and": ["∧", "⋀", "&"],
+    "or": ["∨", "⋁", "|"],
+    "xor": ["⨁", "⊕", "^"],
+    "implies": ["→", "->"],
+    "iff": ["↔", "<->"],
+    "true": ["⊤"],
+    "false": ["⊥"],
+}
+
+# Binding power of the binary operators, from loosest to tightest. ¬ binds tighter than all of them.
+PRECEDENCE = {"iff": 1, "implies": 2, "or": 3, "xor": 4, "and": 5}
+NEGATION = 6
+
+# p→q→r reads as p→(q→r)
+RIGHT_ASSOCIATIVE = {"implies"}
+
+CONSTANTS = ("true", "false")
+
+TOKENS = sorted(((symbol, op) for op, symbols in SYMBOLS.items() for symbol in symbols), key=lambda item: -len(item[0]))
+
+
+class Node:
+    """
+    A subformula. Nodes are only created through Formula.make, so two nodes are equal exactly when they are the same object.
+    """
+    __slots__ = ("op", "args", "name", "variables")
+
+    def __init__(self, op, args=(), name=None):
+        self.op = op
+        self.args = args
+        self.name = name
+        if op == "var":
+            self.variables = frozenset([name])
+        else:
+            self.variables = frozenset().union(*(arg.variables for arg in args))
+
+    def __str__(self):
+        return render(self)
+
+    def __repr__(self):
+        return "Node({})".format(render(self))
+
+
+class Formula:
+    """
+    Unique table of subformulas. Parsing several expressions with the same Formula makes them share their common subformulas.
+    """
+
+    def __init__(self):
+        self.unique = {}
+
+    def make(self, op, *args, name=None):
+        key = (op, name) + tuple(id(arg) for arg in args)
+        node = self.unique.get(key)
+        if node is None:
+            node = Node(op, args, name)
+            self.unique[key] = node
+        return node
+
+    def variable(self, name):
+        return self.make("var", name=name)
+
+    def parse(self, text):
+        """
+        Parses `text` and returns its root Node. Raises ValueError on malformed input.
+        """
+        return Parser(self, tokenize(text)).parse()
+
+
+def tokenize(text):
+    """
+    Splits text into (kind, value, position) tuples. Every letter is a variable.
+    """
+    tokens = []
+    position = 0
+    while position < len(text):
+        char = text[position]
+        if char.isspace():
+            position += 1
+            continue
+        if char in "()":
+            tokens.append((char, char, position))
+            position += 1
+            continue
+        if char.isalpha():
+            tokens.append(("var", char, position))
+            position += 1
+            continue
+        for symbol, op in TOKENS:
+            if text.startswith(symbol, position):
+                tokens.append((op, symbol, position))
+                position += len(symbol)
+                break
+        else:
+            raise ValueError("Unknown symbol '{}' at position {}".format(char, position + 1))
+    tokens.append(("end", "", position))
+    return tokens
+
+
+class Parser:
+    def __init__(self, formula, tokens):
+        self.formula = formula
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position]
+
+    def advance(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self):
+        if self.peek()[0] == "end":
+            raise ValueError("Empty expression")
+        # Parentheses, ¬ and → chains nest the parser's calls
+        try:
+            node = self.expression(0)
+        except RecursionError:
+            raise ValueError("Expression nested too deeply") from None
+        kind, value, position = self.peek()
+        if kind != "end":
+            raise ValueError("Unexpected '{}' at position {}".format(value, position + 1))
+        return node
+
+    def expression(self, minimum):
+        left = self.prefix()
+        while True:
+            kind, value, position = self.peek()
+            power = PRECEDENCE.get(kind)
+            if power is None:
+                if kind in ("end", ")"):
+                    return left
+                raise ValueError("Expected an operator before '{}' at position {}".format(value, position + 1))
+            if power < minimum:
+                return left
+            self.advance()
+            right = self.expression(power if kind in RIGHT_ASSOCIATIVE else power + 1)
+            left = self.formula.make(kind, left, right)
+
+    def prefix(self):
+        kind, value, position = self.advance()
+        if kind == "var":
+            return self.formula.variable(value)
+        if kind in CONSTANTS:
+            return self.formula.make(kind)
+        if kind == "not":
+            return self.formula.make("not", self.prefix())
+        if kind == "(":
+            node = self.expression(0)
+            closing = self.advance()
+            if closing[0] != ")":
+                raise ValueError("Missing ')' for '(' at position {}".format(position + 1))
+            return node
+        if kind == "end":
+            raise ValueError("Unexpected end of expression")
+        raise ValueError("Unexpected '{}' at position {}".format(value, position + 1))
+
+
+def binding(node):
+    if node.op == "not":
+        return NEGATION
+    return PRECEDENCE.get(node.op, NEGATION + 1)
+
+
+def render(node, names=None):
+    """
+    Prints a node with the calculator's symbols and only the parentheses precedence requires.
+    `names` optionally renames the variables. Subformulas are printed children first, so depth is not limited by recursion.
+    """
+    texts = {}
+
+    def text(sub):
+        if sub.op == "var":
+            return names[sub.name] if names else sub.name
+        return texts[sub]
+
+    for sub in subformulas(node):
+        if sub.op in CONSTANTS:
+            texts[sub] = SYMBOLS[sub.op][0]
+        elif sub.op == "not":
+            operand = text(sub.args[0])
+            texts[sub] = "¬" + (operand if binding(sub.args[0]) >= NEGATION else "(" + operand + ")")
+        else:
+            power = PRECEDENCE[sub.op]
+            left, right = sub.args
+            left_text, right_text = text(left), text(right)
+            # Operands binding as loosely as the operator keep their parentheses on the non-associative side
+            if binding(left) < power or (binding(left) == power and sub.op in RIGHT_ASSOCIATIVE):
+                left_text = "(" + left_text + ")"
+            if binding(right) < power or (binding(right) == power and sub.op not in RIGHT_ASSOCIATIVE):
+                right_text = "(" + right_text + ")"
+            texts[sub] = left_text + SYMBOLS[sub.op][0] + right_text
+    return text(node)
+
+
+def subformulas(*roots):
+    """
+    Distinct non-variable subformulas of the roots, children before parents.
+    Walked with an explicit stack: a node is pushed again, marked done, below its arguments.
+    """
+    seen = set()
+    order = []
+    for root in roots:
+        stack = [(root, False)]
+        while stack:
+            node, done = stack.pop()
+            if done:
+                if node.op != "var":
+                    order.append(node)
+                continue
+            if node in seen:
+                continue
+            seen.add(node)
+            stack.append((node, True))
+            # Reversed, so the left argument is visited first
+            stack.extend((arg, False) for arg in reversed(node.args))
+    return order
+
+
+def occurrences(*roots):
+    """
+    Number of operators written in the roots, counting every repetition of a subformula.
+    """
+    size = {}
+    for node in subformulas(*roots):
+        size[node] = 1 + sum(size.get(arg, 0) for arg in node.args)
+    return sum(size.get(root, 0) for root in roots)
+
+
+def variables(*roots):
+    return sorted(frozenset().union(*(root.variables for root in roots)))
+
+
+def to_python(node, names=None):
+    """
+    Python source of a node. `names` maps already computed nodes to the identifier holding their value.
+    """
+    if names and node in names:
+        return names[node]
+    if node.op == "var":
+        return node.name
+    if node.op == "true":
+        return "True"
+    if node.op == "false":
+        return "False"
+    args = [to_python(arg, names) for arg in node.args]
+    if node.op == "not":
+        return "(not {})".format(args[0])
+    if node.op == "and":
+        return "({} and {})".format(*args)
+    if node.op == "or":
+        return "({} or {})".format(*args)
+    if node.op == "xor":
+        return "({} != {})".format(*args)
+    if node.op == "implies":
+        return "((not {}) or {})".format(*args)
+    return "({} == {})".format(*args)
+
+
+def evaluate(root, assignment):
+    """
+    Value of a formula under a {variable: bool} assignment.
+    """
+    values = {}
+
+    def value(node):
+        return assignment[node.name] if node.op == "var" else values[node]
+
+    for node in subformulas(root):
+        args = [value(arg) for arg in node.args]
+        if node.op in CONSTANTS:
+            values[node] = node.op == "true"
+        elif node.op == "not":
+            values[node] = not args[0]
+        elif node.op == "and":
+            values[node] = args[0] and args[1]
+        elif node.op == "or":
+            values[node] = args[0] or args[1]
+        elif node.op == "xor":
+            values[node] = args[0] != args[1]
+        elif node.op == "implies":
+            values[node] = not args[0] or args[1]
+        else:
+            values[node] = args[0] == args[1]
+    return value(root)
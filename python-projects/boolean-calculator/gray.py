@@ -0,0 +1,109 @@
+#Gray-code incremental evaluation: rows are visited in Gray-code order, where every step flips a single variable,
+#and only the subformulas depending on that variable are recomputed (node.variables tells which ones).
+#The walk is compiled into one function keeping every value in a local; rows are written back at their index,
+#so the result keeps the usual product([True, False]) order.
+from functools import lru_cache
+import formula
+
+
+# Gray order is used when a step recomputes on average at most this fraction of the subformulas
+RATIO = 0.5
+
+# Below this many variables compiling the walk costs more than it saves: measured with
+# benchmark_suite.py --engines compiled gray, Gray order only wins from 13 variables in every family.
+# With NumPy the bitset engine takes every table from calculate.BITSET_THRESHOLD variables, so Gray order never runs.
+MIN_VARIABLES = 13
+
+# Walks kept compiled, so the chunks of a table and repeated tables of a formula compile it once
+WALKS = 16
+
+
+def expected_work(final, variables):
+    """
+    Average number of subformulas recomputed per row: the variable of bit b flips every 2^(b+1) rows.
+    """
+    nodes = formula.subformulas(*final)
+    count = len(variables)
+    return sum(sum(1 for node in nodes if variables[count - 1 - b] in node.variables) / 2 ** (b + 1)
+               for b in range(count))
+
+
+def worthwhile(final, variables):
+    """
+    Whether the formula's structure is local enough for Gray order to beat recomputing every subformula per row.
+    """
+    if len(variables) < MIN_VARIABLES:
+        return False
+    return expected_work(final, variables) <= RATIO * len(formula.subformulas(*final))
+
+
+def compile_walk(final, variables):
+    """
+    Compiles walk(first, size): rows [first, first + size) of the table, where `size` is a power of two and `first`
+    a multiple of it. Row first + (k ^ (k >> 1)) is visited at step k, which flips the variable of the lowest set bit of k.
+    """
+    nodes = formula.subformulas(*final)
+    count = len(variables)
+    names = {}
+    for j, node in enumerate(nodes):
+        for arg in node.args:
+            if arg.op == "var":
+                names[arg] = "v{}".format(variables.index(arg.name))
+        names[node] = "_{}".format(j)
+
+    def assign(node):
+        # Each node is written from the locals of its arguments
+        return "{} = {}".format(names[node], formula.to_python(node, {arg: names[arg] for arg in node.args}))
+
+    def column(node):
+        return "v{}".format(variables.index(node.name)) if node.op == "var" else names[node]
+
+    row = "[{}]".format(", ".join(["v{}".format(i) for i in range(count)] + [column(node) for node in final]))
+    lines = ["def walk(first, size):"]
+    for i in range(count):
+        lines.append("    v{0} = not (first >> {1}) & 1".format(i, count - 1 - i))
+    lines += ["    " + assign(node) for node in nodes]
+    lines.append("    block = [None] * size")
+    lines.append("    block[0] = " + row)
+    if count:
+        lines.append("    for k in range(1, size):")
+        lines.append("        bit = (k & -k).bit_length() - 1")
+        # Bit b belongs to variable count-1-b; low bits flip most often, so they are tested first
+        for b in range(count):
+            i = count - 1 - b
+            lines.append("        {} bit == {}:".format("if" if b == 0 else "elif", b))
+            lines.append("            v{0} = not v{0}".format(i))
+            lines += ["            " + assign(node) for node in nodes if variables[i] in node.variables]
+        lines.append("        block[k ^ (k >> 1)] = " + row)
+    lines.append("    return block")
+
+    namespace = {}
+    exec(compile("\n".join(lines), "<gray>", "exec"), namespace)
+    return namespace["walk"]
+
+
+@lru_cache(maxsize=WALKS)
+def cached_walk(final, variables):
+    return compile_walk(final, variables)
+
+
+def chunk_rows(variables, final, start, stop):
+    """
+    Rows [start, stop) of the table, in table order. The range is covered by aligned blocks of rows that
+    share their leading variables, each walked in Gray-code order over its trailing variables.
+    """
+    walk = cached_walk(tuple(final), tuple(variables))
+    low = min(len(variables), max(stop - start - 1, 1).bit_length())
+    table = []
+    for block in range(start >> low, ((stop - 1) >> low) + 1):
+        first = block << low
+        rows = walk(first, 1 << low)
+        table += rows[max(start - first, 0):stop - first]
+    return table
+
+
+def eval_operations(final, variables):
+    """
+    Same contract as calculate.eval_operations: one list per row with the variables and subformulas.
+    """
+    return chunk_rows(variables, final, 0, 2 ** len(variables))
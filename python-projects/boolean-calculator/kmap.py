@@ -0,0 +1,108 @@
+#Karnaugh maps drawn from a result column that is already computed, with the implicants of the minimal DNF as groups.
+#Rows and columns follow Gray-code order, so neighbouring cells differ in one variable. Up to MAX_VARIABLES the whole
+#map is drawn; above, one slice of the hypercube at a time: the leading variables are fixed and the last
+#SLICE_VARIABLES form the map. A slice is a contiguous block of rows of the table, so only its rows are evaluated
+#when the table was not computed.
+from string import ascii_uppercase
+import cache
+import calculate as clc
+import minimize
+
+
+# Largest number of variables drawn as a single map
+MAX_VARIABLES = 6
+
+# Variables of each slice when there are more
+SLICE_VARIABLES = 4
+
+
+def gray(bits):
+    return [k ^ (k >> 1) for k in range(2 ** bits)]
+
+
+def label(code, bits):
+    """
+    Values of an axis' variables for a Gray code, bit 0 meaning True as in the table.
+    """
+    return "".join('F' if (code >> (bits - 1 - j)) & 1 else 'T' for j in range(bits))
+
+
+def slices(variables):
+    """
+    Number of slices of a table's hypercube.
+    """
+    return 1 if len(variables) <= MAX_VARIABLES else 2 ** (len(variables) - SLICE_VARIABLES)
+
+
+def draw(variables, column):
+    """
+    Map of a whole column (at most MAX_VARIABLES variables). True cells list the groups covering them,
+    and the groups are written below as terms of the minimal DNF.
+    """
+    count = len(variables)
+    implicants = sorted(minimize.cover(minimize.minterms(column), count), key=lambda item: (-item[0], item[1]))
+    names = [ascii_uppercase[k] if k < len(ascii_uppercase) else "*" for k in range(len(implicants))]
+
+    row_bits = count // 2
+    column_bits = count - row_bits
+    top = 2 ** count - 1
+
+    def cell(row):
+        if not column[row]:
+            return "F"
+        groups = "".join(name for name, implicant in zip(names, implicants) if minimize.covers(implicant, top - row))
+        return "T " + groups
+
+    corner = "".join(variables[:row_bits]) + "\\" + "".join(variables[row_bits:])
+    heads = [label(code, column_bits) for code in gray(column_bits)]
+    grid = [[label(code, row_bits)] + [cell((code << column_bits) | other) for other in gray(column_bits)]
+            for code in gray(row_bits)]
+    widths = [max(len(corner), max(len(line[0]) for line in grid))]
+    widths += [max(len(heads[j]), max(len(line[j + 1]) for line in grid)) for j in range(len(heads))]
+
+    lines = [" | ".join(text.center(width) for text, width in zip([corner] + heads, widths))]
+    lines.append("-+-".join("-" * width for width in widths))
+    lines += [" | ".join(text.center(width) for text, width in zip(line, widths)) for line in grid]
+    if implicants:
+        if implicants[0][1] == top:
+            lines.append("Groups: A = ⊤")
+        else:
+            lines.append("Groups: " + ", ".join("{} = {}".format(name, minimize.term_text(implicant, variables))
+                                                 for name, implicant in zip(names, implicants)))
+    return "\n".join(lines)
+
+
+def render(variables, column, index=0, start=0):
+    """
+    The map of a column, or its slice number `index` when there are more than MAX_VARIABLES variables.
+    `column` holds the rows of the table from `start` on.
+    """
+    if len(variables) <= MAX_VARIABLES:
+        return draw(variables, column)
+    lead = len(variables) - SLICE_VARIABLES
+    index %= slices(variables)
+    size = 2 ** SLICE_VARIABLES
+    fixed = ", ".join("{}={}".format(name, 'F' if (index >> (lead - 1 - i)) & 1 else 'T')
+                      for i, name in enumerate(variables[:lead]))
+    return "Slice {} of {} ({}):\n{}".format(index + 1, slices(variables), fixed,
+                                           draw(variables[lead:], column[index * size - start:(index + 1) * size - start]))
+
+
+def show(expression, index=0):
+    """
+    K-maps of every side, drawn from the result columns calculate() already computed when it did.
+    A slice of a table that was not computed only evaluates its own rows.
+    """
+    try:
+        # The columns are those of the simplified sides, over the union of their variables
+        count = len(set().union(*(variables for variables, final in clc.prepare(expression, simplified=True))))
+        if count <= MAX_VARIABLES:
+            start = 0
+            variables, sides = cache.result_columns(expression)
+        else:
+            index %= 2 ** (count - SLICE_VARIABLES)
+            start = index * 2 ** SLICE_VARIABLES
+            variables, sides = cache.result_columns(expression, start=start, stop=start + 2 ** SLICE_VARIABLES)
+    except ValueError as error:
+        return "{} ({})".format(clc.INVALID, error)
+    return "\n\n".join("{}\n{}".format(side, render(variables, column, index, start)) for side, column in sides)
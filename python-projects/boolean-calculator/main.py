@@ -1,21 +1,87 @@
 #Please insert EVERYTHING using GUI
 #pip install tabulate
-#Please use parentheses, ⨉ p∨q∨r ✓ (p∨q)∨r
-#Even for negatives: ⨉ ¬q⋀¬p ✓ (¬q)⋀(¬p)
-# ⨉ ¬(p⋀¬q⋀s) ✓ ¬(p⋀((¬q)⋀s)) or ¬((p⋀(¬q))⋀s)
+#Operators bind from tightest to loosest: ¬ ∧ ⨁ ∨ → ↔, so p∨q∧r = p∨(q∧r) and ¬q∧¬p = (¬q)∧(¬p)
+#→ groups to the right: p→q→r = p→(q→r)
 from tkinter import *;
-from tkinter import scrolledtext;
 from itertools import product
 import calculate as clc
+import cache
+import background
+import kmap
+from table_view import VirtualTable, TEXT_ROWS
 
 
 i = 0
+job = None
+kmap_expression = None
+kmap_slice = 0
+
+# Milliseconds between two looks at the running job
+POLL_MS = 50
+
+#Background jobs: the computation runs in a worker thread, the window polls it with after()
+def start_job(show, function, *args, report=True):
+    global job
+    if job is not None:
+        job.cancel()
+    job = background.Job(function, *args, report=report).start()
+    status.config(text=job.status())
+    window.after(POLL_MS, poll_job, job, show)
+
+def poll_job(current, show):
+    global job
+    if current is not job:  # cancelled or replaced by a newer job
+        return
+    if not current.finished:
+        status.config(text=current.status())
+        window.after(POLL_MS, poll_job, current, show)
+        return
+    job = None
+    status.config(text="")
+    if current.error is not None:
+        table.show_text("{} ({})".format(clc.INVALID, current.error))
+    else:
+        show(current.result)
+
+def cancel_job():
+    global job
+    if job is not None:
+        job.cancel()
+        job = None
+        status.config(text="Cancelled.")
+
 #Calculate process via relational_algebra.py
 def run_calculation():
     expression = initial_text.get()
-    result = clc.calculate(expression)  # Call calculate()
-    table.delete("1.0", END)
-    table.insert("end", result)
+    try:
+        tables = clc.lazy_tables(expression)
+    except ValueError:
+        tables = None
+    #Big tables are scrolled virtually: only the rows on screen are ever computed
+    if tables and sum(side.rows for side in tables) > TEXT_ROWS:
+        cancel_job()
+        status.config(text="")
+        table.show_tables(tables)
+    else:
+        start_job(table.show_text, cache.calculate, expression)  # Call calculate(), through the formula cache
+
+#Equivalence/tautology check, answered without building the table
+def run_check():
+    expression = initial_text.get()
+    start_job(table.show_text, clc.check, expression)
+
+#Minimal DNF/CNF of the expression
+def run_minimize():
+    expression = initial_text.get()
+    start_job(table.show_text, clc.minimal_forms, expression)
+
+#K-map of the expression, drawn from the table already computed; clicking again shows the next slice
+def run_kmap():
+    global kmap_expression, kmap_slice
+    expression = initial_text.get()
+    kmap_slice = kmap_slice + 1 if expression == kmap_expression else 0
+    kmap_expression = expression
+    start_job(table.show_text, kmap.show, expression, kmap_slice, report=False)
 
 #Color function
 def change_to_white(button):
@@ -54,7 +120,7 @@ window.title("TRUTH TABLE GEENRATOR.")
 window.config(bg='white')
 window.geometry("1197x560")
 
-table = scrolledtext.ScrolledText(window, width=100, height=5)
+table = VirtualTable(window, width=100, height=5)
 table.grid(row=2, column=0, columnspan=13, padx=10, pady=10)
 
 initial_text = Entry(window, font=("Helvetica 11 bold"), bg='white', fg= '#F9813A', borderwidth= 0, highlightbackground= '#1A1C20', justify='center', width= 100)
@@ -113,11 +179,16 @@ button_open_parentheses = Button(window, text = "(", width = 5, height= 2, font=
 button_close_parentheses = Button(window, text = ")", width = 5, height= 2, font=("Helvetica 11 bold"), bg='white', fg='#F9813A', activebackground='#FFD5CD', borderwidth=0, command= lambda: click_add(")"))
 button_equals = Button(window, text = "≡", width = 5, height= 2, font=("Helvetica 11 bold"), bg='#F9813A', fg='#FCF1F1', activebackground='#B85F2B', borderwidth=0, command= lambda: click_add("≡"))
 button_send = Button(window, text = "CALCULATE TABLE.", width = 50, height= 2, font=("Helvetica 11 bold"), bg='#F9813A', activebackground='#B85F2B', fg='#FCF1F1',borderwidth=0, command=run_calculation)
+button_check = Button(window, text = "CHECK ≡ / TAUTOLOGY.", width = 20, height= 2, font=("Helvetica 11 bold"), bg='#F9813A', activebackground='#B85F2B', fg='#FCF1F1',borderwidth=0, command=run_check)
+button_minimize = Button(window, text = "MINIMIZE.", width = 10, height= 2, font=("Helvetica 11 bold"), bg='#F9813A', activebackground='#B85F2B', fg='#FCF1F1',borderwidth=0, command=run_minimize)
+button_kmap = Button(window, text = "K-MAP.", width = 20, height= 2, font=("Helvetica 11 bold"), bg='#F9813A', activebackground='#B85F2B', fg='#FCF1F1',borderwidth=0, command=run_kmap)
+button_cancel = Button(window, text = "CANCEL.", width = 10, height= 2, font=("Helvetica 11 bold"), bg='#F9813A', activebackground='#B85F2B', fg='#FCF1F1',borderwidth=0, command=cancel_job)
+status = Label(window, text = "", width = 60, height= 1, font=("Helvetica 11 bold"), bg='white', fg='#F9813A', borderwidth=0)
 space_bar = Label(window, width=5, height=10, bg='white')
 instructions_title = Label(window, text = "USAGE INSTRUCTIONS.", width = 25, height= 2, font=("Helvetica 11 bold"), bg='white', fg='#F9813A', borderwidth=0)
-instructions_text1 = Label(window, text = "Please use parentheses to connect operations: ⨉ p∨q∨r ✓ (p∨q)∨r", width = 100, height= 2, font=("Helvetica 11 bold"), bg='white', fg='#F9813A', borderwidth=0)
-instructions_text2 = Label(window, text = "Please use parentheses when applying negation, unless negating an entire expression: ⨉ ¬q⋀¬p ✓ (¬q)⋀(¬p)", width = 120, height= 2, font=("Helvetica 11 bold"), bg='white', fg='#F9813A', borderwidth=0)
-example1 = Label(window, text = " ⨉ ¬(p⋀¬q⋀s) ✓ ¬(p⋀((¬q)⋀s)) o ¬((p⋀(¬q))⋀s)", width = 100, height= 2, font=("Helvetica 11 bold"), bg='white', fg='#F9813A', borderwidth=0, justify='left')
+instructions_text1 = Label(window, text = "Operators bind from tightest to loosest: ¬ ∧ ⨁ ∨ → ↔   (p∨q∧r = p∨(q∧r), p→q→r = p→(q→r))", width = 100, height= 2, font=("Helvetica 11 bold"), bg='white', fg='#F9813A', borderwidth=0)
+instructions_text2 = Label(window, text = "Parentheses are only needed to change that order: ¬q∧¬p = (¬q)∧(¬p), ¬(p∧q) negates the whole group", width = 120, height= 2, font=("Helvetica 11 bold"), bg='white', fg='#F9813A', borderwidth=0)
+example1 = Label(window, text = "Compare expressions with ≡, as many as needed:  ¬(p∧q) ≡ ¬p∨¬q ≡ q→¬p", width = 100, height= 2, font=("Helvetica 11 bold"), bg='white', fg='#F9813A', borderwidth=0, justify='left')
 bottom = Label(window, width=170, height=1, bg='#F9813A', borderwidth=0)
 
 #Add buttons to window
@@ -178,6 +249,13 @@ button_if_and_only_if.grid(row = 5, column = 15, padx= 2, pady= 5)
 
 #Row 5
 button_send.grid(row= 6, column= 1, columnspan= 8, padx= 2, pady= 5)
+button_check.grid(row= 6, column= 9, columnspan= 3, padx= 5, pady= 5)
+button_minimize.grid(row= 6, column= 14, columnspan= 2, padx= 2, pady= 5)
+
+#Row 6
+status.grid(row= 7, column= 1, columnspan= 8, padx= 2, pady= 2)
+button_kmap.grid(row= 7, column= 9, columnspan= 3, padx= 5, pady= 5)
+button_cancel.grid(row= 7, column= 14, columnspan= 2, padx= 2, pady= 5)
 
 #Row 8
 instructions_title.grid(row = 8, column=3, columnspan= 8, padx = 2, pady= 5)
@@ -196,9 +274,14 @@ change_to_white(button_ac)
 change_to_white(button_del)
 change_to_white(button_equals)
 change_to_white(button_send)
+change_to_white(button_check)
+change_to_white(button_minimize)
+change_to_white(button_cancel)
+change_to_white(button_kmap)
 
 
 
 
 
-window.mainloop()
+if __name__ == "__main__":
+    window.mainloop()
@@ -0,0 +1,357 @@
+#Two-level minimization of a truth table's result column into a minimal DNF or CNF.
+#An implicant is a (value, mask) pair of bitmasks: bits set in mask are free, the others must match value.
+#Bit n-1-i stands for the i-th variable, so minterm m is row 2^n - 1 - m of the table.
+
+# Up to this many minterms the exact method (Quine–McCluskey + Petrick) is used, above it the Espresso-style heuristic.
+# Quine–McCluskey's work grows with the implicants of the minterms, not with the number of variables: a dense
+# 12-variable side has thousands of them, while a sparse 20-variable one has a handful.
+EXACT_TERMS = 1024
+
+# Cubes with up to 2^SMALL_CUBE minterms are tracked minterm by minterm while covering, bigger ones as cubes
+SMALL_CUBE = 6
+
+# Petrick's method gives up on exact covering past this many partial products and covers greedily
+PETRICK_LIMIT = 1000
+
+
+def minterms(column):
+    """
+    Minterms of a result column given in table order (first row all True).
+    """
+    top = len(column) - 1
+    return [top - row for row, value in enumerate(column) if value]
+
+
+def popcount(value):
+    return bin(value).count("1")
+
+
+def prime_implicants(terms, size, progress=None):
+    """
+    Quine–McCluskey: implicants are grouped by the popcount of their value and only merged with the
+    implicant one bit above them, found by lookup instead of comparing every pair of groups.
+    `progress(merging rounds done, size)` is called after every round.
+    """
+    current = {(term, 0) for term in terms}
+    primes = set()
+    rounds = 0
+    while current:
+        if progress is not None:
+            progress(rounds, size)
+        rounds += 1
+        groups = {}
+        for value, mask in current:
+            groups.setdefault(popcount(value), set()).add((value, mask))
+
+        merged = set()
+        combined = set()
+        for count, group in groups.items():
+            above = groups.get(count + 1)
+            if not above:
+                continue
+            for value, mask in group:
+                for k in range(size):
+                    bit = 1 << k
+                    if (value | mask) & bit == 0 and (value | bit, mask) in above:
+                        merged.add((value, mask | bit))
+                        combined.add((value, mask))
+                        combined.add((value | bit, mask))
+        primes |= current - combined
+        current = merged
+    return primes
+
+
+def covers(implicant, term):
+    value, mask = implicant
+    return term & ~mask == value
+
+
+def petrick(options):
+    """
+    Smallest set of primes covering every term, given the primes covering each term: the product of
+    those sums is expanded into a sum of products, keeping only products that are not supersets of another.
+    Returns None when the expansion grows past PETRICK_LIMIT.
+    """
+    products = [frozenset()]
+    for covering in options:
+        expanded = set()
+        for product in products:
+            if any(option in product for option in covering):
+                expanded.add(product)
+            else:
+                expanded.update(product | {option} for option in covering)
+        # Absorption: X + XY = X
+        products = []
+        for product in sorted(expanded, key=len):
+            if not any(other <= product for other in products):
+                products.append(product)
+        if len(products) > PETRICK_LIMIT:
+            return None
+    # Fewest primes, then fewest literals (most free bits)
+    return min(products, key=lambda product: (len(product), -sum(popcount(mask) for value, mask in product)))
+
+
+def greedy_cover(covering, remaining):
+    """
+    Covers the remaining terms taking each time the prime that covers most of them.
+    """
+    counts = {}
+    for term in remaining:
+        for prime in covering[term]:
+            counts[prime] = counts.get(prime, 0) + 1
+    remaining = set(remaining)
+    chosen = []
+    while remaining:
+        best = max(counts, key=lambda prime: (counts[prime], popcount(prime[1])))
+        chosen.append(best)
+        value, mask = best
+        for sub in submasks(mask):
+            term = value | sub
+            if term in remaining:
+                remaining.discard(term)
+                for prime in covering[term]:
+                    counts[prime] -= 1
+    return chosen
+
+
+def exact(terms, size, progress=None):
+    """
+    Minimum cover of the terms: essential primes first, Petrick's method (or greedy covering) for the rest.
+    """
+    primes = sorted(prime_implicants(terms, size, progress))
+    covering = {term: [] for term in terms}
+    for value, mask in primes:
+        for sub in submasks(mask):
+            covering[value | sub].append((value, mask))
+
+    chosen = list(dict.fromkeys(options[0] for options in covering.values() if len(options) == 1))
+    covered = {value | sub for value, mask in chosen for sub in submasks(mask)}
+    remaining = [term for term in terms if term not in covered]
+    if remaining:
+        rest = petrick([covering[term] for term in remaining])
+        chosen += sorted(rest) if rest is not None else greedy_cover(covering, remaining)
+    return chosen
+
+
+def inside(cube, terms):
+    """
+    Whether some of the terms lie in the cube.
+    """
+    value, mask = cube
+    return any(term & ~mask == value for term in terms)
+
+
+def expand(term, size, onset, offset):
+    """
+    Frees one variable at a time while the bigger cube stays out of the off-set. The new half of the cube is checked
+    through its own minterms or through the off-set, whichever is smaller.
+    """
+    value, mask = term, 0
+    for k in range(size):
+        bit = 1 << k
+        half = (value ^ bit, mask)
+        if 2 ** popcount(mask) <= len(offset):
+            fits = all(half[0] | sub in onset for sub in submasks(mask))
+        else:
+            fits = not inside(half, offset)
+        if fits:
+            value, mask = value & ~bit, mask | bit
+    return value, mask
+
+
+def cofactors(cubes, space, bit):
+    """
+    The cubes restricted to the halves of the sub-space where `bit` is 0 and where it is 1.
+    """
+    rest = space & ~bit
+    low = [(value, mask & rest) for value, mask in cubes if mask & bit or not value & bit]
+    high = [(value & ~bit, mask & rest) for value, mask in cubes if mask & bit or value & bit]
+    return low, high
+
+
+def filling(cubes, space):
+    """
+    Whether the cubes hold enough minterms to fill the sub-space, counting overlaps twice.
+    """
+    return sum(2 ** popcount(mask) for value, mask in cubes) >= 2 ** popcount(space)
+
+
+def tautology(cubes, space):
+    """
+    Whether the cubes cover the whole sub-space whose free bits are `space` (each cube's mask is within it).
+    Shannon expansion on a variable some cube fixes, stopped as soon as the cubes are too few to fill the space.
+    """
+    stack = [(cubes, space)]
+    while stack:
+        cubes, space = stack.pop()
+        if any(mask == space for value, mask in cubes):
+            continue
+        if not filling(cubes, space):
+            return False
+        fixed = space & ~cubes[0][1]
+        bit = fixed & -fixed
+        stack += [(half, space & ~bit) for half in cofactors(cubes, space, bit)]
+    return True
+
+
+def uncovered(cubes, space):
+    """
+    A minterm of the sub-space outside every cube, or None when the cubes cover it. Same expansion as tautology,
+    going first into the half the cubes are too few to fill, which surely has such a minterm.
+    """
+    stack = [(cubes, space, 0)]
+    while stack:
+        cubes, space, point = stack.pop()
+        if not cubes:
+            return point
+        if any(mask == space for value, mask in cubes):
+            continue
+        fixed = space & ~cubes[0][1]
+        bit = fixed & -fixed
+        low, high = cofactors(cubes, space, bit)
+        halves = [(low, space & ~bit, point), (high, space & ~bit, point | bit)]
+        stack += sorted(halves, key=lambda half: not filling(half[0], half[1]))
+    return None
+
+
+def covered_by(cube, others):
+    """
+    Whether the cube lies in the union of the others: the others, restricted to the cube, are a tautology.
+    """
+    value, mask = cube
+    restricted = [(other & mask, other_mask & mask) for other, other_mask in others
+                  if (other ^ value) & ~other_mask & ~mask == 0]
+    return bool(restricted) and tautology(restricted, mask)
+
+
+def irredundant(cubes):
+    """
+    Drops redundant cubes, the smallest first: a cube goes when the cubes still kept cover it.
+    Small cubes are checked by counting how many cubes cover each of their minterms, big ones by a tautology check,
+    depending on which costs less over the whole cover.
+    """
+    cubes = sorted(cubes, key=lambda cube: popcount(cube[1]))
+    if sum(2 ** popcount(mask) for value, mask in cubes) > len(cubes) ** 2:
+        kept = list(cubes)
+        for cube in cubes:
+            others = list(kept)
+            others.remove(cube)
+            if covered_by(cube, others):
+                kept = others
+        return kept
+
+    count = {}
+    for value, mask in cubes:
+        for sub in submasks(mask):
+            count[value | sub] = count.get(value | sub, 0) + 1
+    kept = []
+    for value, mask in cubes:
+        if all(count[value | sub] > 1 for sub in submasks(mask)):
+            for sub in submasks(mask):
+                count[value | sub] -= 1
+        else:
+            kept.append((value, mask))
+    return kept
+
+
+def espresso(terms, size, progress=None):
+    """
+    Espresso-style heuristic: every cube is expanded as long as it stays out of the off-set,
+    then redundant cubes are dropped. Not guaranteed minimal, but never enumerates all primes.
+    Each new cube starts from a minterm outside the cubes found so far. With a small off-set that minterm is
+    searched among the cubes themselves, otherwise the minterms are walked: small cubes are tracked through
+    their minterms, big ones are compared with each minterm. `progress(cubes or terms seen, terms)` is called
+    after every cube.
+    """
+    onset = set(terms)
+    offset = [term for term in range(2 ** size) if term not in onset]
+    cubes = []
+    if len(offset) ** 2 <= len(terms):
+        points = [(term, 0) for term in offset]
+        term = uncovered(points, 2 ** size - 1)
+        while term is not None:
+            cubes.append(expand(term, size, onset, offset))
+            if progress is not None:
+                progress(len(cubes), len(terms))
+            term = uncovered(cubes + points, 2 ** size - 1)
+        return irredundant(cubes)
+
+    covered = set()
+    big = []
+    for seen, term in enumerate(sorted(terms, key=popcount, reverse=True)):
+        if term in covered or any(term & ~mask == value for value, mask in big):
+            continue
+        value, mask = expand(term, size, onset, offset)
+        cubes.append((value, mask))
+        if popcount(mask) <= SMALL_CUBE:
+            covered.update(value | sub for sub in submasks(mask))
+        else:
+            # Biggest first, so most minterms are matched by the first cubes tried
+            big.append((value, mask))
+            big.sort(key=lambda cube: popcount(cube[1]), reverse=True)
+        if progress is not None:
+            progress(seen, len(terms))
+    return irredundant(cubes)
+
+
+def submasks(mask):
+    """
+    Every subset of the bits of mask, so value | sub walks the minterms of a cube.
+    """
+    sub = mask
+    while True:
+        yield sub
+        if sub == 0:
+            return
+        sub = (sub - 1) & mask
+
+
+def cover(terms, size, progress=None):
+    """
+    Implicants covering the terms, exactly minimal up to EXACT_TERMS terms. `progress(done, total)` may raise to stop.
+    """
+    if not terms:
+        return []
+    if len(terms) == 2 ** size:
+        return [(0, 2 ** size - 1)]
+    return exact(terms, size, progress) if len(terms) <= EXACT_TERMS else espresso(terms, size, progress)
+
+
+def term_text(implicant, variables, conjunction=True):
+    value, mask = implicant
+    parts = []
+    for i, name in enumerate(variables):
+        bit = 1 << (len(variables) - 1 - i)
+        if mask & bit:
+            continue
+        # CNF clauses negate the literals of the off-set implicant
+        positive = bool(value & bit) == conjunction
+        parts.append(name if positive else "¬" + name)
+    return ("∧" if conjunction else "∨").join(parts)
+
+
+def dnf(variables, column, progress=None):
+    """
+    Minimal sum of products of a result column, with the calculator's symbols.
+    """
+    implicants = cover(minterms(column), len(variables), progress)
+    if not implicants:
+        return "⊥"
+    if implicants[0][1] == 2 ** len(variables) - 1:
+        return "⊤"
+    return "∨".join(term_text(implicant, variables) for implicant in sorted(implicants, key=lambda item: (-item[0], item[1])))
+
+
+def cnf(variables, column, progress=None):
+    """
+    Minimal product of sums: the minimal DNF of the off-set, negated with De Morgan.
+    """
+    implicants = cover(minterms([not value for value in column]), len(variables), progress)
+    if not implicants:
+        return "⊤"
+    if implicants[0][1] == 2 ** len(variables) - 1:
+        return "⊥"
+    clauses = [term_text(implicant, variables, conjunction=False) for implicant in sorted(implicants, key=lambda item: (-item[0], item[1]))]
+    if len(clauses) == 1:
+        return clauses[0]
+    return "∧".join(clause if "∨" not in clause else "(" + clause + ")" for clause in clauses)
@@ -0,0 +1,277 @@
+#Satisfiability checks that never enumerate the truth table.
+#Formulas are turned into clauses with the Tseitin encoding and solved by a small CDCL solver with two watched literals.
+#Literals are non-zero integers: k is "variable k is true", -k is "variable k is false".
+from collections import defaultdict
+import formula
+
+
+# The solver reports its progress every this many conflicts, so a long search can be cancelled
+PROGRESS_CONFLICTS = 100
+
+
+class Encoder:
+    """
+    Tseitin encoding of a DAG: one solver variable per distinct subformula, defined by a few clauses.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.count = 0
+        self.inputs = {}
+        self.literals = {}
+
+    def new(self):
+        self.count += 1
+        return self.count
+
+    def literal(self, root):
+        for node in formula.subformulas(root):
+            if node not in self.literals:
+                self.literals[node] = self.define(node)
+        return self.value(root)
+
+    def value(self, node):
+        if node.op == "var":
+            if node.name not in self.inputs:
+                self.inputs[node.name] = self.new()
+            return self.inputs[node.name]
+        return self.literals[node]
+
+    def define(self, node):
+        if node.op == "not":
+            return -self.value(node.args[0])
+        x = self.new()
+        if node.op in formula.CONSTANTS:
+            self.clauses.append([x if node.op == "true" else -x])
+            return x
+        a, b = (self.value(arg) for arg in node.args)
+        self.clauses += gate(node.op, x, a, b)
+        return x
+
+
+def gate(op, x, a, b):
+    """
+    Clauses forcing x to be the value of `a op b`.
+    """
+    if op == "and":
+        return [[-x, a], [-x, b], [x, -a, -b]]
+    if op == "or":
+        return [[x, -a], [x, -b], [-x, a, b]]
+    if op == "xor":
+        return [[-x, a, b], [-x, -a, -b], [x, -a, b], [x, a, -b]]
+    if op == "implies":
+        return [[x, a], [x, -b], [-x, -a, b]]
+    return [[-x, -a, b], [-x, a, -b], [x, a, b], [x, -a, -b]]
+
+
+def solve(clauses, count, progress=None):
+    """
+    Returns a satisfying {variable: bool} assignment of the clauses, or None.
+    CDCL: conflicts are analysed down to the first unique implication point, the learnt clause
+    is kept and the search jumps back to the level where it becomes unit.
+    `progress(conflicts, 0)` is called every PROGRESS_CONFLICTS conflicts and may raise to stop the search.
+    """
+    value = [None] * (count + 1)
+    level = [0] * (count + 1)
+    reason = [None] * (count + 1)
+    phase = [False] * (count + 1)
+    activity = [0.0] * (count + 1)
+    watches = defaultdict(list)
+    trail = []
+    limits = []
+    database = []
+    units = []
+    bump = 1.0
+    conflicts = 0
+
+    def is_false(literal):
+        return value[abs(literal)] == (literal < 0)
+
+    def is_true(literal):
+        return value[abs(literal)] == (literal > 0)
+
+    def assign(literal, cause):
+        variable = abs(literal)
+        value[variable] = literal > 0
+        level[variable] = len(limits)
+        reason[variable] = cause
+        trail.append(literal)
+
+    def add(clause):
+        watches[clause[0]].append(len(database))
+        watches[clause[1]].append(len(database))
+        database.append(clause)
+        return len(database) - 1
+
+    for clause in clauses:
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            continue
+        if not clause:
+            return None
+        if len(clause) == 1:
+            units.append(clause[0])
+        else:
+            add(clause)
+
+    def propagate(head):
+        """
+        Assigns every literal forced by the trail from `head` on. Returns a conflicting clause or None.
+        """
+        while head < len(trail):
+            false = -trail[head]
+            head += 1
+            watching = watches[false]
+            i = 0
+            while i < len(watching):
+                index = watching[i]
+                clause = database[index]
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if is_true(clause[0]):
+                    i += 1
+                    continue
+                # Look for a new literal to watch instead of the false one
+                for k in range(2, len(clause)):
+                    if not is_false(clause[k]):
+                        clause[1], clause[k] = clause[k], clause[1]
+                        watches[clause[1]].append(index)
+                        watching[i] = watching[-1]
+                        watching.pop()
+                        break
+                else:
+                    if is_false(clause[0]):
+                        return index
+                    assign(clause[0], index)
+                    i += 1
+        return None
+
+    def analyze(conflict):
+        """
+        First-UIP learnt clause of a conflict and the level to jump back to.
+        """
+        nonlocal bump
+        learnt = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        index = len(trail) - 1
+        clause = database[conflict]
+        while True:
+            for other in clause:
+                variable = abs(other)
+                if other == literal or variable in seen or level[variable] == 0:
+                    continue
+                seen.add(variable)
+                activity[variable] += bump
+                if level[variable] == len(limits):
+                    pending += 1
+                else:
+                    learnt.append(other)
+            while abs(trail[index]) not in seen:
+                index -= 1
+            literal = trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = database[reason[abs(literal)]]
+        learnt[0] = -literal
+        bump /= 0.95
+
+        if len(learnt) == 1:
+            return learnt, 0
+        # The second watch must be the literal assigned last, at the level to jump back to
+        deepest = max(range(1, len(learnt)), key=lambda k: level[abs(learnt[k])])
+        learnt[1], learnt[deepest] = learnt[deepest], learnt[1]
+        return learnt, level[abs(learnt[1])]
+
+    def backjump(target):
+        size = limits[target]
+        for literal in trail[size:]:
+            phase[abs(literal)] = literal > 0
+            value[abs(literal)] = None
+        del trail[size:]
+        del limits[target:]
+
+    for literal in units:
+        if is_false(literal):
+            return None
+        if value[abs(literal)] is None:
+            assign(literal, None)
+    head = 0
+    if propagate(head) is not None:
+        return None
+
+    while True:
+        unassigned = [v for v in range(1, count + 1) if value[v] is None]
+        if not unassigned:
+            return {v: value[v] for v in range(1, count + 1)}
+
+        variable = max(unassigned, key=activity.__getitem__)
+        limits.append(len(trail))
+        head = len(trail)
+        assign(variable if phase[variable] else -variable, None)
+
+        conflict = propagate(head)
+        while conflict is not None:
+            if not limits:
+                return None
+            conflicts += 1
+            if progress is not None and conflicts % PROGRESS_CONFLICTS == 0:
+                progress(conflicts, 0)
+            learnt, target = analyze(conflict)
+            backjump(target)
+            head = len(trail)
+            if len(learnt) == 1:
+                assign(learnt[0], None)
+            else:
+                assign(learnt[0], add(learnt))
+            conflict = propagate(head)
+
+
+def find(*roots, polarities=None, progress=None):
+    """
+    Assignment of the variables of the roots making every root take the requested polarity
+    (True by default), or None when there is none.
+    """
+    encoder = Encoder()
+    literals = [encoder.literal(root) for root in roots]
+    clauses = list(encoder.clauses)
+    for literal, polarity in zip(literals, polarities or [True] * len(roots)):
+        clauses.append([literal if polarity else -literal])
+
+    model = solve(clauses, encoder.count, progress)
+    if model is None:
+        return None
+    return {name: model[index] for name, index in sorted(encoder.inputs.items())}
+
+
+def satisfiable(root, progress=None):
+    """
+    A satisfying assignment of the formula, or None.
+    """
+    return find(root, progress=progress)
+
+
+def tautology(root, progress=None):
+    """
+    Returns (True, None) when the formula is always true, (False, counterexample) otherwise.
+    """
+    counterexample = find(root, polarities=[False], progress=progress)
+    return counterexample is None, counterexample
+
+
+def equivalent(left, right, progress=None):
+    """
+    Returns (True, None) when both formulas agree on every assignment, (False, counterexample) otherwise.
+    """
+    encoder = Encoder()
+    a, b = encoder.literal(left), encoder.literal(right)
+    difference = encoder.new()
+    clauses = encoder.clauses + gate("xor", difference, a, b) + [[difference]]
+
+    model = solve(clauses, encoder.count, progress)
+    if model is None:
+        return True, None
+    return False, {name: model[index] for name, index in sorted(encoder.inputs.items())}
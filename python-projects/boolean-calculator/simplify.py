@@ -0,0 +1,149 @@
+#Symbolic simplification of parsed formulas, applied before evaluation so fewer and cheaper columns reach the engine.
+#Rules: constant folding, double negation, idempotence, complement, absorption and De Morgan normalization
+#(¬a∧¬b becomes ¬(a∨b), one negation instead of two). Every rule keeps or shrinks the formula, so rewriting ends.
+#Chains of ∧ and of ∨ are flattened first, so a∧b∧¬a or a∨b∨a are seen as a whole.
+import formula
+
+
+DUAL = {"and": "or", "or": "and"}
+
+# Neutral and absorbing element of each chain
+UNIT = {"and": "true", "or": "false"}
+ZERO = {"and": "false", "or": "true"}
+
+
+def simplify(table, root):
+    """
+    Simplified equivalent of root, built in the same Formula table so it keeps sharing subformulas with the other sides.
+    Every distinct subformula is rewritten once, children first.
+    """
+    done = {}
+    for node in formula.subformulas(root):
+        done[node] = rewrite(table, node.op, [done.get(arg, arg) for arg in node.args])
+    return done.get(root, root)
+
+
+def operands(node, op):
+    """
+    Operands of a chain of the same operator: (a∧b)∧c gives [a, b, c].
+    """
+    found = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.op != op:
+            found.append(node)
+        else:
+            # Reversed, so the operands come out left to right
+            stack += [node.args[1], node.args[0]]
+    return found
+
+
+def complements(a, b):
+    return (a.op == "not" and a.args[0] is b) or (b.op == "not" and b.args[0] is a)
+
+
+def negate(table, node):
+    if node.op == "not":
+        return node.args[0]
+    if node.op == "true":
+        return table.make("false")
+    if node.op == "false":
+        return table.make("true")
+    return table.make("not", node)
+
+
+def junction(table, op, items):
+    """
+    Simplified chain of ∧ or ∨ over the items, in their original order.
+    """
+    dual = DUAL[op]
+    kept = []
+    for item in items:
+        for x in operands(item, op):
+            if x.op == ZERO[op]:
+                return table.make(ZERO[op])
+            # Identity and idempotence: a∧⊤ = a, a∧a = a
+            if x.op == UNIT[op] or x in kept:
+                continue
+            kept.append(x)
+
+    members = set(kept)
+    negated = {x.args[0] for x in kept if x.op == "not"}
+    # Complement: a∧¬a = ⊥, a∨¬a = ⊤
+    if members & negated:
+        return table.make(ZERO[op])
+
+    changed = False
+    result = []
+    for x in kept:
+        if x.op != dual:
+            result.append(x)
+            continue
+        terms = operands(x, dual)
+        # Absorption: a∧(a∨b) = a
+        if any(term in members for term in terms):
+            changed = True
+            continue
+        # Complement inside absorption: a∧(¬a∨b) = a∧b
+        rest = [term for term in terms if not (term in negated or (term.op == "not" and term.args[0] in members))]
+        if len(rest) < len(terms):
+            changed = True
+            result.append(junction(table, dual, rest))
+        else:
+            result.append(x)
+    if changed:
+        return junction(table, op, result)
+
+    if not result:
+        return table.make(UNIT[op])
+    # De Morgan: ¬a∧¬b = ¬(a∨b)
+    if len(result) > 1 and all(x.op == "not" for x in result):
+        return negate(table, junction(table, dual, [x.args[0] for x in result]))
+
+    node = result[0]
+    for x in result[1:]:
+        node = table.make(op, node, x)
+    return node
+
+
+def rewrite(table, op, args):
+    """
+    Node for op applied to already simplified arguments.
+    """
+    if op in formula.CONSTANTS:
+        return table.make(op)
+    if op == "not":
+        return negate(table, args[0])
+    if op in DUAL:
+        return junction(table, op, args)
+
+    left, right = args
+    if op == "implies":
+        if left.op == "true" or right.op == "false":
+            return negate(table, left) if right.op == "false" else right
+        if left.op == "false" or right.op == "true" or left is right:
+            return table.make("true")
+        # a→¬a = ¬a, ¬a→a = a
+        if complements(left, right):
+            return right
+        return table.make(op, left, right)
+
+    # ⨁ and ↔ only differ by a negation
+    if op == "xor":
+        same, opposite = "false", "true"
+    else:
+        same, opposite = "true", "false"
+    for constant, other in ((left, right), (right, left)):
+        if constant.op == same:
+            return other
+        if constant.op == opposite:
+            return negate(table, other)
+    if left is right:
+        return table.make(same)
+    if complements(left, right):
+        return table.make(opposite)
+    # ¬a⨁¬b = a⨁b
+    if left.op == "not" and right.op == "not":
+        return table.make(op, left.args[0], right.args[0])
+    return table.make(op, left, right)
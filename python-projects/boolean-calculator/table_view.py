@@ -0,0 +1,124 @@
+#Virtualized truth-table widget: only the rows on screen are computed and laid out,
+#so a table of 2^20 rows scrolls as fast as one of 8.
+from tkinter import *
+
+
+# Tables with up to this many rows in total are shown as plain text, larger ones virtually
+TEXT_ROWS = 4096
+
+
+def widths(table):
+    """
+    Width of every column: the header, or the row number for the N° column.
+    """
+    return [max(len(table.headers[0]), len(str(table.rows - 1)))] + [max(len(header), 1) for header in table.headers[1:]]
+
+
+def format_line(cells, sizes):
+    first = cells[0].rjust(sizes[0])
+    return "  ".join([first] + [cell.center(size) for cell, size in zip(cells[1:], sizes[1:])])
+
+
+def line_count(tables):
+    """
+    Virtual lines of the tables: a header per table, its rows, and a blank line between tables.
+    """
+    return sum(1 + table.rows for table in tables) + len(tables) - 1
+
+
+def visible_lines(tables, first, count):
+    """
+    Text of the virtual lines [first, first + count), computing only the rows they show.
+    """
+    lines = []
+    offset = 0
+    for number, table in enumerate(tables):
+        sizes = widths(table)
+        if number:
+            if offset >= first and len(lines) < count:
+                lines.append("")
+            offset += 1
+        if offset >= first and len(lines) < count:
+            lines.append(format_line(table.headers, sizes))
+        offset += 1
+
+        # Rows of this table that fall in the window
+        start = max(first - offset, 0)
+        stop = min(first + count - offset, table.rows)
+        if start < stop and len(lines) < count:
+            for index, row in enumerate(table.window(start, stop), start):
+                lines.append(format_line([str(index)] + ['T' if val else 'F' for val in row], sizes))
+        offset += table.rows
+        if offset >= first + count:
+            break
+    return lines[:count]
+
+
+class VirtualTable(Frame):
+    """
+    Output area showing plain text, or truth tables of any size rendering only the visible window of rows.
+    """
+
+    def __init__(self, master, width=100, height=5, **options):
+        Frame.__init__(self, master, **options)
+        self.text = Text(self, width=width, height=height, wrap="none")
+        self.scrollbar = Scrollbar(self, orient=VERTICAL)
+        self.text.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.tables = None
+        self.first = 0
+        self.total = 0
+        self.text.bind("<MouseWheel>", lambda e: self.wheel(-1 if e.delta > 0 else 1))
+        self.text.bind("<Button-4>", lambda e: self.wheel(-1))
+        self.text.bind("<Button-5>", lambda e: self.wheel(1))
+        self.show_text("")
+
+    def height(self):
+        return int(self.text.cget("height"))
+
+    def show_text(self, text):
+        """
+        Plain text, scrolled by the Text widget itself.
+        """
+        self.tables = None
+        self.text.config(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.config(command=self.text.yview)
+        self.text.delete("1.0", END)
+        self.text.insert("end", text)
+
+    def show_tables(self, tables):
+        """
+        Truth tables (calculate.LazyTable) whose rows are computed as they scroll into view.
+        """
+        self.tables = tables
+        self.total = line_count(tables)
+        self.first = 0
+        self.text.config(yscrollcommand="")
+        self.scrollbar.config(command=self.scroll)
+        self.render()
+
+    def scroll(self, action, amount, unit=None):
+        if self.tables is None:
+            return
+        if action == "moveto":
+            self.first = int(float(amount) * self.total)
+        elif unit == "pages":
+            self.first += int(amount) * self.height()
+        else:
+            self.first += int(amount)
+        self.render()
+
+    def wheel(self, direction):
+        if self.tables is None:
+            self.text.yview_scroll(direction * 3, "units")
+        else:
+            self.scroll("scroll", direction * 3, "units")
+        return "break"
+
+    def render(self):
+        height = self.height()
+        self.first = max(0, min(self.first, self.total - height))
+        lines = visible_lines(self.tables, self.first, height)
+        self.text.delete("1.0", END)
+        self.text.insert("end", "\n".join(lines))
+        self.scrollbar.set(self.first / self.total, min(1.0, (self.first + height) / self.total))
@@ -0,0 +1,136 @@
+#Compact binary truth tables: every subformula column is stored as packed 64-bit words, one bit per row.
+#Layout (little endian):
+#  MAGIC (8 bytes) | header length (uint64) | JSON header, padded with spaces to 8 bytes | data
+#The header lists the tables: {"variables", "formulas", "rows", "words", "offset"}, where offset is the byte position
+#of the table's first column from the start of the data, and column j starts at offset + 8 * words * j.
+#The sides of ≡ share one table over the union of their variables; "compare" then holds the positions of the sides
+#in the formulas. Files written before that have one table per side and no "compare".
+#Variable columns are not stored, row r gives them back: variable i is True iff bit n-1-i of r is 0.
+#The data is memory-mapped on load, so opening a 2^26-row table does not read it and any row is a few word lookups.
+import json
+import numpy as np
+import bitset
+import calculate as clc
+
+
+MAGIC = b"TTBL\x00\x00\x00\x01"
+
+# Rows evaluated at a time while writing
+CHUNK_SIZE = 1 << 20
+
+
+def packed_chunk(variables, final, start, stop):
+    """
+    Packed columns of the subformulas for rows [start, stop), without the variables.
+    """
+    return bitset.evaluate(final, variables, start, stop)[len(variables):]
+
+
+def write(expression, path, workers=None):
+    """
+    Writes the table of the expression, all its sides sharing it, to `path`. Raises ValueError on malformed expressions.
+    """
+    variables, final, compare = clc.unified(expression)
+    rows = 2 ** len(variables)
+    words = -(-rows // bitset.WORD)
+    entry = {"variables": variables, "formulas": [str(node) for node in final], "rows": rows, "words": words, "offset": 0}
+    if compare:
+        entry["compare"] = compare
+    offset = 8 * words * len(final)
+
+    header = json.dumps({"tables": [entry]}, ensure_ascii=False).encode("utf-8")
+    header += b" " * (-len(header) % 8)
+    start = len(MAGIC) + 8 + len(header)
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(np.uint64(len(header)).astype("<u8").tobytes())
+        file.write(header)
+        file.truncate(start + offset)
+    if not offset:
+        return
+
+    data = np.memmap(path, dtype="<u8", mode="r+", offset=start, shape=(offset // 8,))
+    ranges = clc.chunks(variables, CHUNK_SIZE)
+    for (first, stop), columns in zip(ranges, clc.run_chunks(packed_chunk, variables, final, ranges, workers)):
+        word = first // bitset.WORD
+        for j, column in enumerate(columns):
+            data[j * words + word:j * words + word + len(column)] = column
+    data.flush()
+    del data
+
+
+class PackedTable:
+    """
+    One table of a table file, memory-mapped. Rows come back in the same shape as calculate.LazyTable's,
+    "≡" column included when the sides share it, so a loaded file can be shown by the GUI's VirtualTable.
+    """
+
+    def __init__(self, entry, data):
+        self.variables = entry["variables"]
+        self.formulas = entry["formulas"]
+        self.compare = entry.get("compare")
+        self.headers = ["N°"] + self.variables + self.formulas + (["≡"] if self.compare else [])
+        self.rows = entry["rows"]
+        self.words = entry["words"]
+        base = entry["offset"] // 8
+        self.columns = data[base:base + self.words * len(self.formulas)].reshape(len(self.formulas), self.words)
+
+    def row(self, index):
+        """
+        Values of the variables and subformulas at row `index`.
+        """
+        if not 0 <= index < self.rows:
+            raise IndexError("row {} out of range".format(index))
+        word, bit = divmod(index, bitset.WORD)
+        values = [bool((int(value) >> bit) & 1) for value in self.columns[:, word]]
+        if self.compare:
+            values.append(len({values[j] for j in self.compare}) == 1)
+        return list(clc.row_assignment(self.variables, index).values()) + values
+
+    def column(self, name):
+        """
+        Result column of a subformula, unpacked to booleans.
+        """
+        packed = self.columns[self.formulas.index(name)]
+        return bitset.unpack([np.asarray(packed)], self.rows)[:, 0]
+
+    def window(self, start, stop):
+        """
+        Rows [start, stop), clipped to the table.
+        """
+        stop = min(stop, self.rows)
+        if start >= stop:
+            return []
+        first = start // bitset.WORD
+        last = -(-stop // bitset.WORD)
+        packed = [np.asarray(column[first:last]) for column in self.columns]
+        values = bitset.unpack(packed, (last - first) * bitset.WORD)[start - first * bitset.WORD:stop - first * bitset.WORD]
+        rows = [list(state) + row for state, row in zip(clc.states(len(self.variables), start, stop), values.tolist())]
+        return clc.agreeing(rows, self.variables, self.compare) if self.compare else rows
+
+    def agreement(self):
+        """
+        Groups of sides (indexes into `compare`) agreeing on every row, compared word by word without unpacking.
+        """
+        if not self.compare:
+            return [[0]]
+        columns = np.array(self.columns[self.compare])
+        if self.rows % bitset.WORD:
+            # Bits past the last row are not part of the table
+            columns[:, -1] &= np.uint64((1 << self.rows % bitset.WORD) - 1)
+        return clc.agreement(columns)
+
+
+def load(path):
+    """
+    Memory-maps a table file and returns its PackedTables. Raises ValueError when it is not one.
+    """
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("{} is not a truth table file".format(path))
+        length = int(np.frombuffer(file.read(8), dtype="<u8")[0])
+        header = json.loads(file.read(length).decode("utf-8"))
+    start = len(MAGIC) + 8 + length
+    size = sum(8 * entry["words"] * len(entry["formulas"]) for entry in header["tables"])
+    data = np.memmap(path, dtype="<u8", mode="r", offset=start, shape=(size // 8,)) if size else np.zeros(0, dtype="<u8")
+    return [PackedTable(entry, data) for entry in header["tables"]]
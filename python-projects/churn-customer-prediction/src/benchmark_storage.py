@@ -0,0 +1,54 @@
+# Compares the load time of the cleaned dataset stored as CSV, Parquet and Feather.
+# Usage (from src/): python benchmark_storage.py [--scale N] [--repeat N]
+# --scale repeats the rows N times, to see how the formats behave on extracts larger than the sample dataset.
+import argparse
+import os
+import tempfile
+import time
+import pandas as pd
+import pyarrow.feather as feather
+from data_preprocessing import CLEANED_PATH, run_preprocess_data
+from storage import COMPRESSION, read_frame, write_frame
+
+
+def best_time(load, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare load times of the intermediate file formats.")
+    parser.add_argument("--scale", type=int, default=1, help="times the cleaned rows are repeated (default: 1)")
+    parser.add_argument("--repeat", type=int, default=5, help="loads per format, the best one is kept (default: 5)")
+    args = parser.parse_args()
+
+    if not os.path.exists(CLEANED_PATH):
+        run_preprocess_data()
+    df = pd.concat([read_frame(CLEANED_PATH)] * args.scale, ignore_index=True)
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = {name: os.path.join(folder, "cleaned." + name) for name in ["csv", "parquet", "feather", "feather_lz4"]}
+        df.to_csv(paths["csv"], index=False)
+        write_frame(df, paths["parquet"])
+        feather.write_feather(df, paths["feather"], compression="uncompressed")
+        feather.write_feather(df, paths["feather_lz4"], compression="lz4")
+
+        formats = {
+            "CSV": (paths["csv"], lambda: pd.read_csv(paths["csv"])),
+            "Parquet ({})".format(COMPRESSION): (paths["parquet"], lambda: read_frame(paths["parquet"])),
+            "Feather": (paths["feather"], lambda: feather.read_table(paths["feather"], memory_map=True).to_pandas()),
+            "Feather (lz4)": (paths["feather_lz4"], lambda: feather.read_table(paths["feather_lz4"], memory_map=True).to_pandas()),
+        }
+        print(f"Rows: {len(df)}")
+        print(f"{'Format':<16}{'Size (MiB)':>12}{'Load (ms)':>12}")
+        for name, (path, load) in formats.items():
+            seconds = best_time(load, args.repeat)
+            print(f"{name:<16}{os.path.getsize(path) / 2 ** 20:>12.2f}{seconds * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,168 @@
+import csv
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from storage import write_frame, write_chunks
 
-def run_preprocess_data():
-    # Load raw data, as a single column, then split into multiple columns. Specify no header in raw data.
-    df_raw = pd.read_csv('../data/raw/churn_data.csv', header=None)
-    df = df_raw[0].str.split(",", expand=True)
+RAW_PATH = '../data/raw/churn_data.csv'
+CLEANED_PATH = '../data/processed/cleaned_churn_data.parquet'
 
-    # Specify the header names as the first row of the dataframe
-    df.columns = df.iloc[0]
+# Yes/No columns, stored as 0/1. A service the customer cannot have counts as No.
+BINARY_COLUMNS = ['Partner', 'Dependents', 'PhoneService', 'PaperlessBilling',
+                  'Churn', 'OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
+                  'TechSupport', 'StreamingTV', 'StreamingMovies', 'MultipleLines']
+BINARY_VALUES = {'Yes': 1, 'No': 0, 'No internet service': 0, 'No phone service': 0}
 
-    # Drop the first row as it is now the header
-    df = df.drop(df.index[0]).reset_index(drop=True)
+FLOAT_COLUMNS = ['MonthlyCharges', 'TotalCharges']
+
+# Types given to the parser, so every column is built once in its final type:
+# low-cardinality text as categoricals, integers as nullable ints and charges as float32.
+DTYPES = {
+    'customerID': 'string',
+    'gender': 'category',
+    'SeniorCitizen': 'Int8',
+    'tenure': 'Int16',
+    'InternetService': 'category',
+    'Contract': 'category',
+    'PaymentMethod': 'category',
+    'MonthlyCharges': 'float32',
+    'TotalCharges': 'float32',
+    **{col: 'category' for col in BINARY_COLUMNS},
+}
+
+# New customers have a blank TotalCharges
+NA_VALUES = [' ', '']
+
+TENURE_BINS = [0, 12, 24, 48, 60, np.inf]
+TENURE_LABELS = ['0-12', '13-24', '25-48', '49-60', '60+']
+
+
+def read_header(path):
+    """
+    Column names of the raw file and whether each line is wrapped in quotes, as the raw export does.
+    """
+    with open(path, encoding='utf-8') as file:
+        first_line = file.readline().strip()
+    wrapped = first_line.startswith('"') and first_line.endswith('"')
+    return first_line.strip('"').split(','), wrapped
+
+
+def arrow_options(columns, wrapped, block_size=None):
+    # Quotes are only left unparsed when they wrap whole lines, as in the raw export, not fields
+    arrow_types = {'string': pa.string(), 'category': pa.dictionary(pa.int32(), pa.string()),
+                   'Int8': pa.int8(), 'Int16': pa.int16(), 'float32': pa.float32()}
+    read_options = pa_csv.ReadOptions(column_names=columns, skip_rows=1)
+    if block_size is not None:
+        read_options.block_size = block_size
+    return dict(
+        read_options=read_options,
+        parse_options=pa_csv.ParseOptions(quote_char=False) if wrapped else pa_csv.ParseOptions(),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={col: arrow_types[dtype] for col, dtype in DTYPES.items()},
+            null_values=NA_VALUES, strings_can_be_null=False),
+    )
+
+
+def arrow_to_pandas(table):
+    nullable = {pa.int8(): pd.Int8Dtype(), pa.int16(): pd.Int16Dtype(), pa.string(): pd.StringDtype()}
+    return table.to_pandas(types_mapper=nullable.get)
+
+
+def strip_quotes(df, columns):
+    # Only the first and last fields keep a quote: strip it from customerID and from the Churn categories
+    first, last = columns[0], columns[-1]
+    df[first] = df[first].str.removeprefix('"')
+    df[last] = df[last].cat.rename_categories(lambda value: value.removesuffix('"'))
+    return df
+
+
+def read_options(wrapped):
+    return dict(dtype=DTYPES, na_values=NA_VALUES, keep_default_na=False,
+                quoting=csv.QUOTE_NONE if wrapped else csv.QUOTE_MINIMAL)
 
-    print("DataFrame shape:", df.shape)
-    print("DataFrame columns:", df.columns.tolist())
 
+def load_raw_data(path=RAW_PATH, engine='c'):
+    """
+    Parses the raw CSV once, straight into typed columns.
+    engine='pyarrow' uses the multithreaded Arrow reader.
+    """
+    columns, wrapped = read_header(path)
+    if engine == 'pyarrow':
+        df = arrow_to_pandas(pa_csv.read_csv(path, **arrow_options(columns, wrapped)))
+    else:
+        df = pd.read_csv(path, names=columns, header=0, **read_options(wrapped))
+    return strip_quotes(df, columns) if wrapped else df
 
-    # Convert appropriate columns to numeric types
-    binary_columns = ['Partner', 'Dependents', 'PhoneService', 'PaperlessBilling',
-                    'Churn', 'OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
-                    'TechSupport', 'StreamingTV', 'StreamingMovies', 'MultipleLines']
 
-    df[binary_columns] = df[binary_columns].replace({'Yes': 1, 'No': 0, 'No internet service': 0, 'No phone service': 0})
+def row_bytes(path, sample=1 << 16):
+    """
+    Average size of a line, from the start of the file.
+    """
+    with open(path, 'rb') as file:
+        head = file.read(sample)
+    return max(len(head) // max(head.count(b'\n'), 1), 1)
+
+
+def iter_raw_data(path=RAW_PATH, engine='c', chunksize=100_000):
+    """
+    Same typed frames as load_raw_data, in chunks of about `chunksize` rows, so the file never has to fit in memory.
+    With engine='pyarrow' the chunks are the record batches of a streaming Arrow reader.
+    """
+    columns, wrapped = read_header(path)
+    if engine == 'pyarrow':
+        # Arrow sizes its batches in bytes
+        reader = pa_csv.open_csv(path, **arrow_options(columns, wrapped, chunksize * row_bytes(path)))
+        chunks = (arrow_to_pandas(pa.Table.from_batches([batch])) for batch in reader)
+    else:
+        chunks = pd.read_csv(path, names=columns, header=0, chunksize=chunksize, **read_options(wrapped))
+    for chunk in chunks:
+        yield strip_quotes(chunk, columns) if wrapped else chunk
+
+
+def clean(df):
+    """
+    Cleaning of a typed frame. Every step works row by row, so a chunk is cleaned on its own.
+    """
+    # Convert binary columns to 0/1. Mapping a categorical only maps its few categories.
+    for col in BINARY_COLUMNS:
+        df[col] = df[col].map(BINARY_VALUES).astype('int8')
 
-    # Convert to appropiate data types
-    df['SeniorCitizen'] = df['SeniorCitizen'].astype(int)
-    df['tenure'] = pd.to_numeric(df['tenure'], errors='coerce')
-    df['MonthlyCharges'] = pd.to_numeric(df['MonthlyCharges'], errors='coerce')
-    df['TotalCharges'] = pd.to_numeric(df['TotalCharges'], errors='coerce')
     # Drop rows with NA or inf values
-    df = df.replace([np.inf, -np.inf], np.nan).dropna()
-    # Now, convert categorical columns to string type
-    df = df.astype({
-        'customerID': 'string',
-        'gender': 'string',
-        'InternetService': 'string',
-        'Contract': 'string',
-        'PaymentMethod': 'string',
-    })
-
-    # For latter use, we will add a tenure_group column to categorize tenure into groups for better analysis
-    df['tenure_group'] = pd.cut(df['tenure'], bins=[0, 12, 24, 48, 60, np.inf], labels=['0-12', '13-24', '25-48', '49-60', '60+'])
+    df[FLOAT_COLUMNS] = df[FLOAT_COLUMNS].replace([np.inf, -np.inf], np.nan)
+    df = df.dropna()
+
+    # For latter use, we will add a tenure_group column to categorize tenure into groups for better analysis.
+    # The bins are fixed, so every chunk gets the same categories.
+    return df.assign(tenure_group=pd.cut(df['tenure'], bins=TENURE_BINS, labels=TENURE_LABELS))
+
+
+def preprocess_chunks(engine, chunksize):
+    """
+    Streaming mode of run_preprocess_data: cleans the raw file chunk by chunk, each chunk becoming a row group
+    of the cleaned file. Returns the number of rows written.
+    """
+    rows = write_chunks((clean(chunk) for chunk in iter_raw_data(RAW_PATH, engine, chunksize)), CLEANED_PATH)
+    print("Rows written:", rows)
+    return rows
+
+
+def run_preprocess_data(engine='c', chunksize=None):
+    # With a chunksize the raw file is streamed and nothing is returned but the row count
+    if chunksize is not None:
+        return preprocess_chunks(engine, chunksize)
+
+    # Load raw data with explicit types, in a single parsing pass
+    df = load_raw_data(RAW_PATH, engine)
+
+    print("DataFrame shape:", df.shape)
+    print("DataFrame columns:", df.columns.tolist())
+
+    df = clean(df)
 
     # Display columns and their data types
     print(df.info())
 
-    # Save the cleaned dataframe to a new CSV file
-    df.to_csv('../data/processed/cleaned_churn_data.csv', index=False) 
-    return df
\ No newline at end of file
+    # Save the cleaned dataframe with its types, for the next stages
+    write_frame(df, CLEANED_PATH)
+    return df
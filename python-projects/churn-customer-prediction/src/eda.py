@@ -1,90 +1,143 @@
+import io
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages 
+from matplotlib.backends.backend_pdf import PdfPages
+from pypdf import PdfWriter
 
-def run_eda(df):
-    #Class distribution of target variable
-    print("Class distribution of target variable 'Churn':", df['Churn'].value_counts(),"\n")
-    print("Percentage of churned customers:", df['Churn'].value_counts(normalize=True).map(lambda x: f"{x:.2%}"),"\n")
-
-    #Summary statistics
-    print("Summary statistics of numerical columns:\n", df.describe())
-    print("Summary statistics of categorical columns:\n", df.describe(include=['object']))
+CATEGORICAL_REPORT = "../reports/report_categorical.pdf"
+NUMERICAL_REPORT = "../reports/report_numerical.pdf"
+NUMERICAL_KDE_REPORT = "../reports/report_numerical_kde.pdf"
+HEATMAP_REPORT = "../reports/report_heatmap.pdf"
+REPORT_PATHS = [CATEGORICAL_REPORT, NUMERICAL_REPORT, NUMERICAL_KDE_REPORT, HEATMAP_REPORT]
 
-    #Visualize class imbalance
-    sns.countplot(x='Churn', data=df)
-    plt.title('Churn Distribution')
-    plt.show()
-    plt.close()
-
-    categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
-    print("Categorical columns:", categorical_cols,"\n")
-
-    """
-    As it is a categorical variable, we will display the distribution of churn by categorical columns.
-    For numeric columns, it is more common to use boxplots or violin plotsto visualize the distribution 
-    of churn across different numeric values.
-    """
-
-    # Churn by category
-    with PdfPages("../reports/report_categorical.pdf") as pdf:
-        for col in categorical_cols:
-            if col != 'customerID':
-                plt.figure(figsize=(10,5))
-                sns.countplot(x=col, hue='Churn', data=df)
-                plt.title(f'Churn by {col}')
-                plt.xticks(rotation=45) 
-                plt.tight_layout()
-                pdf.savefig(plt.gcf())  # Save each plot to a PDF file
-                plt.show()
-                plt.close()
 
+def plot_categorical(df, col):
     """
     Churn by category explanation.
     For each categorical column, we create a count plot that shows the distribution of churned and non-churned customers.
     The x-axis represents the categories of the column, while the y-axis shows the count of customers in each category.
     The hue parameter is set to 'Churn', which allows us to see how churn varies across different categories.
-    This helps us identify which categories have a higher proportion of churned customers, providing insights into customer 
+    This helps us identify which categories have a higher proportion of churned customers, providing insights into customer
     behavior and potential factors contributing to churn.
 
     plt.xticks(rotation=45) is used to rotate the x-axis labels for better readability, especially if the category names are long.
     plt.tight_layout() ensures that the plot elements fit well within the figure area, preventing overlap.
     """
+    # Churn by category
+    plt.figure(figsize=(10,5))
+    sns.countplot(x=col, hue='Churn', data=df)
+    plt.title(f'Churn by {col}')
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    return plt.gcf()
 
-    numerical_cols = df.select_dtypes(include=['number']).columns.tolist()
 
+def plot_numerical(df, col):
     # Churn by numerical values
-    with PdfPages("../reports/report_numerical.pdf") as pdf:
-        for col in numerical_cols:
-            if col != 'Churn':
-                plt.figure(figsize=(10,5))
-                sns.boxplot(x='Churn', y=col, data=df)
-                plt.title(f'{col} by Churn')
-                plt.tight_layout()
-                pdf.savefig(plt.gcf())
-                plt.show()
-                plt.close()
+    plt.figure(figsize=(10,5))
+    sns.boxplot(x='Churn', y=col, data=df)
+    plt.title(f'{col} by Churn')
+    plt.tight_layout()
+    return plt.gcf()
+
 
+def plot_numerical_kde(df, col):
     # KDE plots for numerical columns
-    with PdfPages("../reports/report_numerical_kde.pdf") as pdf:
-        for col in numerical_cols:
-            if col != 'Churn':
-                plt.figure(figsize=(10,5))
-                sns.kdeplot(hue='Churn', x=col, data=df, common_norm=False)
-                plt.title(f'Distribution of {col} by Churn')
-                plt.tight_layout()
-                pdf.savefig(plt.gcf())
-                plt.show()
-                plt.close()
+    plt.figure(figsize=(10,5))
+    sns.kdeplot(hue='Churn', x=col, data=df, common_norm=False)
+    plt.title(f'Distribution of {col} by Churn')
+    plt.tight_layout()
+    return plt.gcf()
 
+
+def plot_heatmap(df, col=None):
     # Correlation heatmap
     numeric_df = df.select_dtypes(include=['number'])
     corr = numeric_df.corr()
-    with PdfPages("../reports/report_heatmap.pdf") as pdf:
-        plt.figure(figsize=(12,10))
-        sns.heatmap(corr, annot=True, fmt=".2f", cmap='coolwarm', square=True)
-        plt.title('Correlation Heatmap')
-        pdf.savefig(plt.gcf())
+    plt.figure(figsize=(12,10))
+    sns.heatmap(corr, annot=True, fmt=".2f", cmap='coolwarm', square=True)
+    plt.title('Correlation Heatmap')
+    return plt.gcf()
+
+
+# DataFrame of a report worker, sent once when the worker starts instead of with every figure
+worker_df = None
+
+
+def init_worker(df):
+    global worker_df
+    plt.switch_backend('Agg')
+    worker_df = df
+
+
+def render_page(plot, col):
+    # Runs in a worker: draws one figure and returns it as a one-page PDF
+    fig = plot(worker_df, col)
+    page = io.BytesIO()
+    fig.savefig(page, format='pdf')
+    plt.close(fig)
+    return page.getvalue()
+
+
+def write_reports(df, reports, workers=None):
+    """
+    Headless report generation: every figure is rendered in a process pool with the Agg backend,
+    then the pages of each report are assembled in order.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(df,)) as pool:
+        pages = {path: [pool.submit(render_page, plot, col) for plot, col in figures] for path, figures in reports.items()}
+        for path, futures in pages.items():
+            writer = PdfWriter()
+            for future in futures:
+                writer.append(io.BytesIO(future.result()))
+            with open(path, 'wb') as file:
+                writer.write(file)
+
+
+def run_eda(df, headless=False, workers=None):
+    #Class distribution of target variable
+    print("Class distribution of target variable 'Churn':", df['Churn'].value_counts(),"\n")
+    print("Percentage of churned customers:", df['Churn'].value_counts(normalize=True).map(lambda x: f"{x:.2%}"),"\n")
+
+    #Summary statistics
+    print("Summary statistics of numerical columns:\n", df.describe())
+    print("Summary statistics of categorical columns:\n", df.describe(include=['object', 'category', 'string']))
+
+    #Visualize class imbalance. It is only shown, so there is nothing to draw without a display.
+    if not headless:
+        sns.countplot(x='Churn', data=df)
+        plt.title('Churn Distribution')
         plt.show()
-        plt.close()
\ No newline at end of file
+        plt.close()
+
+    categorical_cols = df.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
+    print("Categorical columns:", categorical_cols,"\n")
+
+    """
+    As it is a categorical variable, we will display the distribution of churn by categorical columns.
+    For numeric columns, it is more common to use boxplots or violin plotsto visualize the distribution
+    of churn across different numeric values.
+    """
+
+    numerical_cols = df.select_dtypes(include=['number']).columns.tolist()
+
+    # Figures of every report, in page order
+    reports = {
+        CATEGORICAL_REPORT: [(plot_categorical, col) for col in categorical_cols if col != 'customerID'],
+        NUMERICAL_REPORT: [(plot_numerical, col) for col in numerical_cols if col != 'Churn'],
+        NUMERICAL_KDE_REPORT: [(plot_numerical_kde, col) for col in numerical_cols if col != 'Churn'],
+        HEATMAP_REPORT: [(plot_heatmap, None)],
+    }
+
+    if headless:
+        write_reports(df, reports, workers)
+        return
+
+    for path, figures in reports.items():
+        with PdfPages(path) as pdf:
+            for plot, col in figures:
+                pdf.savefig(plot(df, col))  # Save each plot to a PDF file
+                plt.show()
+                plt.close()
@@ -1,18 +1,30 @@
 import pandas as pd
 import numpy as np
+from data_preprocessing import CLEANED_PATH
+from storage import write_frame, write_chunks, iter_frames
 
-def run_feature_engineering(df):
+ENGINEERED_PATH = '../data/processed/engineered_churn_data.parquet'
+
+# Count of services subscribed.
+SERVICES = ['PhoneService','MultipleLines', 'OnlineSecurity','OnlineBackup','DeviceProtection',
+            'TechSupport','StreamingTV','StreamingMovies']
+
+# One-hot encoded columns.
+DUMMY_COLUMNS = ['Contract', 'PaymentMethod', 'InternetService']
+
+
+def add_features(df, vocabularies=None):
+    """
+    Features of a cleaned frame. Every feature is computed row by row, except the dummies: with `vocabularies`
+    (categories of each DUMMY_COLUMNS column) every chunk gets the same dummy columns, even if it lacks some values.
+    """
     # Ternure-based features.
     df['tenure_years'] = (df['tenure'] / 12).round(2)
 
     # Binary feature for long-term customers (tenure >= 2 years).
     df['long_term_customer'] = (df['tenure_years'] >= 2).astype(int)
 
-    # Count of services subscribed.
-    services = ['PhoneService','MultipleLines', 'OnlineSecurity','OnlineBackup','DeviceProtection',
-                'TechSupport','StreamingTV','StreamingMovies']
-
-    df['total_service_count'] = df[services].sum(axis=1)
+    df['total_service_count'] = df[SERVICES].sum(axis=1)
 
     # Ratio of MonthlyCharges to TotalCharges.
     df['charges_ratio'] = (df['MonthlyCharges']/df['TotalCharges']).round(2)
@@ -21,9 +33,46 @@ def run_feature_engineering(df):
     df['average_monthly_charges'] = df['average_monthly_charges'].replace([np.inf, -np.inf], np.nan).fillna(0)
 
     # Encoding categorical variables.
-    df = pd.get_dummies(df, columns=['Contract', 'PaymentMethod', 'InternetService'], drop_first=True)
-    df['gender'] = df['gender'].map({'Male': 1, 'Female': 0})
+    if vocabularies is not None:
+        for col in DUMMY_COLUMNS:
+            # Not astype: unordered categorical dtypes compare equal whatever the order of their categories
+            df[col] = pd.Categorical(df[col], categories=vocabularies[col])
+    df = pd.get_dummies(df, columns=DUMMY_COLUMNS, drop_first=True)
+    df['gender'] = df['gender'].map({'Male': 1, 'Female': 0}).astype('int8')
+    return df
+
+
+def learn_vocabularies(path, chunksize):
+    """
+    First pass of the streaming mode: the sorted categories of every dummy column, as get_dummies would find them
+    on the whole file. Only those columns are read.
+    """
+    seen = {col: set() for col in DUMMY_COLUMNS}
+    for chunk in iter_frames(path, chunksize, columns=DUMMY_COLUMNS):
+        for col in DUMMY_COLUMNS:
+            seen[col].update(chunk[col].cat.categories)
+    return {col: sorted(values) for col, values in seen.items()}
+
+
+def engineer_chunks(chunksize):
+    """
+    Streaming mode of run_feature_engineering: learns the dummy vocabularies in a first pass over the cleaned file,
+    then applies them chunk by chunk in a second one, writing the engineered file. Returns the number of rows written.
+    """
+    vocabularies = learn_vocabularies(CLEANED_PATH, chunksize)
+    chunks = (add_features(chunk, vocabularies) for chunk in iter_frames(CLEANED_PATH, chunksize))
+    rows = write_chunks(chunks, ENGINEERED_PATH)
+    print("Rows written:", rows)
+    return rows
+
+
+def run_feature_engineering(df=None, chunksize=None):
+    # With a chunksize the cleaned file is streamed instead of df, and only the row count is returned
+    if chunksize is not None:
+        return engineer_chunks(chunksize)
+
+    df = add_features(df)
 
     # Saving the engineered dataset.
-    df.to_csv('../data/processed/engineered_churn_data.csv', index=False)
-    return df
\ No newline at end of file
+    write_frame(df, ENGINEERED_PATH)
+    return df
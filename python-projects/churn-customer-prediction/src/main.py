@@ -1,25 +1,63 @@
-from data_preprocessing import run_preprocess_data
-from eda import run_eda
-from feature_engineering import run_feature_engineering
-from modeling import run_modeling
+import data_preprocessing
+import eda
+import feature_engineering
+import modeling
+import storage
+from data_preprocessing import run_preprocess_data, RAW_PATH, CLEANED_PATH
+from eda import run_eda, REPORT_PATHS
+from feature_engineering import run_feature_engineering, ENGINEERED_PATH
+from modeling import run_modeling, LOG_REG_PATH, RF_PATH
+from storage import read_frame, iter_frames
+from stage_cache import run_stage
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-logging.info("Starting the churn customer prediction pipeline...")
+# Rows per chunk for extracts larger than memory. None loads each stage's input whole.
+CHUNKSIZE = None
 
+# CSV parser of the raw file: 'c' or 'pyarrow'
+ENGINE = 'c'
 
-logging.info("Running data preprocessing...")
-df = run_preprocess_data()
+def preprocess():
+    run_preprocess_data(ENGINE, CHUNKSIZE)
 
-logging.info("Running EDA...")
-run_eda(df)
 
-logging.info("Running feature engineering...")
-df = run_feature_engineering(df)
+def report():
+    # In streaming mode the reports describe the first chunk. Headless: the figures are rendered in parallel, never shown.
+    run_eda(read_frame(CLEANED_PATH) if CHUNKSIZE is None else next(iter_frames(CLEANED_PATH, CHUNKSIZE)), headless=True)
 
-logging.info("Running modeling...")
-log_reg, rf_clf = run_modeling(df)
 
-logging.info("Models trained and saved successfully.")
-logging.info("Churn customer prediction pipeline completed successfully.")
+def engineer():
+    if CHUNKSIZE is None:
+        run_feature_engineering(read_frame(CLEANED_PATH))
+    else:
+        run_feature_engineering(chunksize=CHUNKSIZE)
+
+
+def train():
+    # The models are fitted in memory, on the engineered features only
+    run_modeling(read_frame(ENGINEERED_PATH))
+
+
+# The EDA process pool imports this module in its workers where processes are spawned, so the pipeline only runs as a script
+if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.info("Starting the churn customer prediction pipeline...")
+
+    # Stages communicate through their files. Each one is skipped when its inputs, code and parameters match a cached run.
+    logging.info("Running data preprocessing...")
+    run_stage('preprocessing', preprocess, [RAW_PATH], [CLEANED_PATH], [data_preprocessing, storage],
+              {'engine': ENGINE, 'chunksize': CHUNKSIZE})
+
+    logging.info("Running EDA...")
+    run_stage('eda', report, [CLEANED_PATH], REPORT_PATHS, [eda, storage], {'chunksize': CHUNKSIZE})
+
+    logging.info("Running feature engineering...")
+    run_stage('feature_engineering', engineer, [CLEANED_PATH], [ENGINEERED_PATH], [feature_engineering, storage],
+              {'chunksize': CHUNKSIZE})
+
+    logging.info("Running modeling...")
+    run_stage('modeling', train, [ENGINEERED_PATH], [LOG_REG_PATH, RF_PATH], [modeling, storage])
+
+    logging.info("Models trained and saved successfully.")
+    logging.info("Churn customer prediction pipeline completed successfully.")
@@ -5,6 +5,9 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
 
+LOG_REG_PATH = "../models/logistic_regression_model.pkl"
+RF_PATH = "../models/random_forest_model.pkl"
+
 def run_modeling(df):
     # Define features and target variable
     x = df.drop(columns=["Churn","customerID","tenure_group"]) # features
@@ -39,7 +42,7 @@ def run_modeling(df):
     print("\nRandom Forest Model Evaluation:")
     evaluate_model(rf_clf, x_test, y_test)
 
-    joblib.dump(log_reg, "../models/logistic_regression_model.pkl")
-    joblib.dump(rf_clf, "../models/random_forest_model.pkl")
+    joblib.dump(log_reg, LOG_REG_PATH)
+    joblib.dump(rf_clf, RF_PATH)
     print("Models exported successfully.")
     return log_reg, rf_clf
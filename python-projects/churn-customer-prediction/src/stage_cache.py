@@ -0,0 +1,71 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+
+# Outputs of the latest run of every stage, stored by key: <CACHE_DIR>/<stage>/<key>/. Deleting it forces a full run.
+# Older runs are evicted, so the cache holds one copy of each stage's outputs.
+CACHE_DIR = '../.cache/stages'
+
+
+def file_digest(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def stage_key(name, function, inputs, modules, params):
+    """
+    Content address of a stage run: its input files, the source code of the stage function and of its modules,
+    and its parameters. Stages chain through their files, so a change only invalidates the stages downstream of it.
+    """
+    sha = hashlib.sha256(name.encode())
+    for path in inputs:
+        sha.update(file_digest(path).encode())
+    sha.update(inspect.getsource(function).encode())
+    for module in modules:
+        sha.update(inspect.getsource(module).encode())
+    sha.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return sha.hexdigest()
+
+
+def copy(source, target):
+    # Through a temporary file, so an interrupted copy never leaves a truncated output behind
+    shutil.copyfile(source, target + '.tmp')
+    os.replace(target + '.tmp', target)
+
+
+def evict(name, key):
+    # Drops every cached run of the stage but the one with this key
+    stage = os.path.join(CACHE_DIR, name)
+    for other in os.listdir(stage):
+        if other != key:
+            shutil.rmtree(os.path.join(stage, other), ignore_errors=True)
+
+
+def run_stage(name, function, inputs, outputs, modules, params=None):
+    """
+    Runs function() unless a run with the same key is cached, in which case its outputs are restored instead.
+    Only the latest run of each stage is kept. Returns whether the stage ran.
+    """
+    key = stage_key(name, function, inputs, modules, params or {})
+    folder = os.path.join(CACHE_DIR, name, key)
+    stored = [os.path.join(folder, os.path.basename(path)) for path in outputs]
+
+    if all(os.path.exists(path) for path in stored):
+        for source, target in zip(stored, outputs):
+            if not os.path.exists(target) or file_digest(target) != file_digest(source):
+                copy(source, target)
+        logging.info("Skipping %s, unchanged since a cached run (%s).", name, key[:12])
+        return False
+
+    function()
+    os.makedirs(folder, exist_ok=True)
+    for source, target in zip(outputs, stored):
+        copy(source, target)
+    evict(name, key)
+    return True
@@ -0,0 +1,45 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Intermediate files between stages are Parquet: compressed, and typed, so categoricals, booleans,
+# nullable integers and the tenure_group category come back as they were written, without parsing text.
+COMPRESSION = 'zstd'
+
+
+def write_frame(df, path):
+    df.to_parquet(path, compression=COMPRESSION, index=False)
+
+
+def read_frame(path, columns=None):
+    # Memory-mapped: the file pages are mapped, not copied into a read buffer first
+    return pd.read_parquet(path, columns=columns, memory_map=True)
+
+
+def write_chunks(chunks, path):
+    """
+    Writes DataFrame chunks to a single Parquet file, one row group each, so the whole data never has to be in memory.
+    The first chunk fixes the schema. Returns the number of rows written.
+    """
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, schema=writer.schema if writer else None, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression=COMPRESSION)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def iter_frames(path, chunksize, columns=None):
+    """
+    Reads a Parquet file back as DataFrames of at most `chunksize` rows, with their original dtypes.
+    """
+    file = pq.ParquetFile(path, memory_map=True)
+    for batch in file.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()